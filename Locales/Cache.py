@@ -0,0 +1,459 @@
+# -*- coding: UTF-8 -*- #
+
+import hashlib
+import io
+import os
+import time
+from collections import OrderedDict, namedtuple
+from threading import RLock, Event
+from Frozen import freeze
+from Loaders import _write_atomic
+
+
+class LRUCache(object):
+    """
+    A bounded, thread-safe mapping which evicts the least recently used entry.
+    """
+
+    def __init__(self, maxsize=128):
+
+        # a maxsize of 0 disables the cache
+        self.maxsize = maxsize
+
+        self._data = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, key, default=None):
+        """
+        Return the value stored under key, marking it as recently used
+
+        :param key: the key to look up
+        :param default: returned if key is not cached
+        :return: the cached value or default
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        """
+        Store value under key, evicting the least recently used entries if needed
+
+        :param key: the key to store under
+        :param value: the value to store
+        :return: None
+        """
+        if not self.maxsize:
+            return
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Remove key from the cache
+
+        :param key: the key to remove
+        :param default: returned if key is not cached
+        :return: the removed value or default
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """
+        Remove all entries
+
+        :return: None
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _Call(object):
+    """
+    A call in progress
+    """
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls for the same key into a single call.
+
+    The first caller for a key makes the call, and callers arriving while it
+    is in progress wait for, and share, its result.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = RLock()
+
+        # key --> number of calls that shared another call's result
+        self.coalesced = {}
+
+    def do(self, key, func, *args):
+        """
+        Call func, unless a call for key is already in progress
+
+        :param key: identifies the call
+        :param func: the function to call
+        :param args: passed to func
+        :return: the result of the call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+
+            if call is not None:
+                self.coalesced[key] = self.coalesced.get(key, 0) + 1
+                leader = False
+
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = func(*args)
+
+        except Exception as e:
+            call.error = e
+            raise
+
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+        return call.result
+
+
+_Entry = namedtuple(u'_Entry', [u'signature', u'checked', u'context'])
+
+
+def signature(path):
+    """
+    Return the (mtime, size) signature of a file, or None if it can't be read
+
+    :param path: the path to the file
+    :return: the signature
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return st.st_mtime, st.st_size
+
+
+class ContextCache(LRUCache):
+    """
+    Caches parsed context, keyed on (path, locale).
+
+    Entries are revalidated against the mtime and size of the file they were
+    loaded from. If a ttl is set, entries are trusted for ttl seconds before
+    being revalidated.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        super(ContextCache, self).__init__(maxsize)
+
+        self.ttl = ttl
+
+        # once frozen, entries are never revalidated or replaced
+        self.frozen = False
+
+        # if changes are pushed by a watcher, don't check the filesystem
+        self.validate = True
+
+        self.flight = SingleFlight()
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path, locale, loader):
+        """
+        Return the context for path, calling loader only if the cached copy is missing or stale
+
+        :param path: the resolved path to the context file
+        :param locale: the locale the context is loaded for
+        :param loader: called with path to load the context
+        :return: the context
+        """
+        return self.lookup(path, locale, loader)[0]
+
+    def lookup(self, path, locale, loader):
+        """
+        As load, but also report whether the context came from the cache
+
+        :param path: the resolved path to the context file
+        :param locale: the locale the context is loaded for
+        :param loader: called with path to load the context
+        :return: the context, and True for a cache hit
+        """
+        key = (path, locale)
+        entry = self.get(key)
+        now = time.time()
+
+        if entry is not None:
+
+            if self.frozen or not self.validate:
+                return self._hit(entry), True
+
+            # within the ttl, trust the entry without touching the filesystem
+            if self.ttl is not None and now - entry.checked < self.ttl:
+                return self._hit(entry), True
+
+            sig = signature(path)
+
+            if sig is not None and sig == entry.signature:
+
+                if self.ttl is not None:
+                    self.set(key, entry._replace(checked=now))
+
+                return self._hit(entry), True
+
+        elif self.validate:
+            sig = signature(path)
+
+        else:
+            sig = None
+
+        def fill():
+            with self._lock:
+                self.misses += 1
+
+            # the signature was taken before loading, so that a change
+            # during the load is picked up next time
+            context = loader(path)
+
+            if sig is not None or not self.validate:
+                self.set(key, _Entry(sig, now, context))
+
+            return context
+
+        # concurrent misses for the same key wait for a single load
+        return self.flight.do(key, fill), False
+
+    def invalidate(self, paths):
+        """
+        Remove the entries loaded from paths, for every locale
+
+        :param paths: the paths that changed
+        :return: None
+        """
+        paths = set(paths)
+
+        with self._lock:
+            for key in [key for key in self._data if key[0] in paths]:
+                del self._data[key]
+
+    def freeze(self):
+        """
+        Make every cached context read-only, and stop revalidating entries
+
+        Used before forking, so that workers share the parsed context.
+
+        :return: None
+        """
+        with self._lock:
+            for key, entry in list(self._data.items()):
+                self._data[key] = entry._replace(context=freeze(entry.context))
+
+            self.frozen = True
+
+    def _hit(self, entry):
+        with self._lock:
+            self.hits += 1
+
+        return entry.context
+
+    def info(self):
+        """
+        Return cache statistics
+
+        :return: a dict of counters
+        """
+        return {
+            u'hits': self.hits,
+            u'misses': self.misses,
+            u'size': len(self),
+            u'maxsize': self.maxsize,
+            u'coalesced': sum(self.flight.coalesced.values()),
+            u'ttl': self.ttl,
+            u'frozen': self.frozen
+        }
+
+
+class MemoryRenderCache(LRUCache):
+    """
+    Caches rendered templates in memory, for ttl seconds if set.
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        super(MemoryRenderCache, self).__init__(maxsize)
+
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        entry = super(MemoryRenderCache, self).get(key)
+
+        if entry is None:
+            return default
+
+        expires, value = entry
+
+        if expires is not None and expires < time.time():
+            self.pop(key)
+            return default
+
+        return value
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl if self.ttl is not None else None
+
+        super(MemoryRenderCache, self).set(key, (expires, value))
+
+
+class FileRenderCache(object):
+    """
+    Caches up to maxsize rendered templates as files, for ttl seconds if set.
+
+    The cache is shared by every process using the folder, and a folder
+    under /dev/shm keeps it in shared memory. Only files named by the cache
+    are ever removed, so the folder can be shared with other files.
+    """
+
+    prefix = u'render-'
+
+    def __init__(self, folder, maxsize=256, ttl=None):
+
+        self.folder = folder
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    def _path(self, key):
+        return os.path.join(self.folder, self.prefix + hashlib.sha1(repr(key).encode(u'utf-8')).hexdigest())
+
+    def _entries(self):
+        """
+        Return the paths of the files written by the cache
+
+        :return: a list of paths
+        """
+        try:
+            filenames = os.listdir(self.folder)
+        except OSError:
+            return []
+
+        return [
+            os.path.join(self.folder, filename) for filename in filenames
+            if _is_entry(filename, self.prefix)
+        ]
+
+    def get(self, key, default=None):
+        """
+        Return the rendered template stored under key
+
+        :param key: the key to look up
+        :param default: returned if key is not cached, or has expired
+        :return: the rendered template or default
+        """
+        path = self._path(key)
+
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                _remove(path)
+                return default
+
+            with io.open(path, u'rb') as infile:
+                return infile.read().decode(u'utf-8')
+
+        except (IOError, OSError):
+            return default
+
+    def set(self, key, value):
+        """
+        Store a rendered template under key, evicting the oldest entries beyond maxsize
+
+        :param key: the key to store under
+        :param value: the rendered template
+        :return: None
+        """
+        _write_atomic(self._path(key), value.encode(u'utf-8'))
+
+        entries = self._entries()
+
+        if len(entries) <= self.maxsize:
+            return
+
+        # another process may have removed some already
+        ages = []
+
+        for path in entries:
+            try:
+                ages.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+
+        ages.sort()
+
+        for mtime, path in ages[:len(ages) - self.maxsize]:
+            _remove(path)
+
+    def clear(self):
+        """
+        Remove all entries
+
+        :return: None
+        """
+        for path in self._entries():
+            _remove(path)
+
+
+def _is_entry(filename, prefix):
+    """
+    Check whether filename was written by a FileRenderCache
+
+    :param filename: the name of the file
+    :param prefix: the cache's prefix
+    :return: True if filename is the prefix followed by a sha1
+    """
+    digest = filename[len(prefix):]
+
+    return filename.startswith(prefix) and len(digest) == 40 and all(c in u'0123456789abcdef' for c in digest)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,60 @@
+# -*- coding: UTF-8 -*- #
+
+import os
+from timeit import default_timer
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from Loaders import compile_yaml
+
+cli = AppGroup(u'locales', help=u'Locales build steps.')
+
+
+@cli.command(u'compile')
+def compile_command():
+    """
+    Compile every yaml file in the context folder into .cc/
+    """
+    locales = current_app.extensions[u'locales']
+
+    start = default_timer()
+    count = 0
+
+    locales.index.build()
+
+    for filename in locales.index:
+
+        if filename.endswith(u'.yaml'):
+            compile_yaml(os.path.join(locales.index.folder, filename))
+            count += 1
+
+    click.echo(u'Compiled {0} context files in {1:.3f}s'.format(count, default_timer() - start))
+
+
+@cli.command(u'compile-templates')
+def compile_templates_command():
+    """
+    Compile every template into the LOCALES_BYTECODE_CACHE folder
+    """
+    locales = current_app.extensions[u'locales']
+
+    try:
+        count, elapsed = locales.compile_templates(current_app)
+    except RuntimeError as e:
+        raise click.UsageError(unicode(e))
+
+    click.echo(u'Compiled {0} templates in {1:.3f}s'.format(count, elapsed))
+
+
+@cli.command(u'pack')
+def pack_command():
+    """
+    Pack the context folder into one file per locale, in .cc/
+    """
+    locales = current_app.extensions[u'locales']
+
+    count, elapsed = locales.build_packs()
+
+    click.echo(u'Packed {0} contexts for {1} locales in {2:.3f}s'.format(count, len(locales._allowed), elapsed))
@@ -0,0 +1,153 @@
+# -*- coding: UTF-8 -*- #
+
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
+
+
+class LazyContext(Mapping):
+    """
+    A read-only context whose top-level sections are decoded on first access.
+
+    Templates usually touch only a few sections of a large context file, so
+    the rest are never decoded.
+    """
+
+    def __init__(self, data, index, base, decode):
+        """
+        :param data: the compiled context, as bytes or an mmap
+        :param index: section key --> (serializer, start, end), relative to base
+        :param base: the offset of the first section within data
+        :param decode: called with (serializer, bytes) to decode a section
+        """
+        self._data = data
+        self._index = index
+        self._base = base
+        self._decode = decode
+
+        # key --> decoded section
+        self._decoded = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+
+        serializer, start, end = self._index[key]
+
+        value = self._decoded[key] = self._decode(serializer, self._data[self._base + start:self._base + end])
+
+        return value
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return u'<{0} {1} sections, {2} decoded>'.format(
+            self.__class__.__name__, len(self._index), len(self._decoded)
+        )
+
+
+class ContextView(Mapping):
+    """
+    A read-only view of several contexts, searched in order.
+
+    Like a ChainMap, nothing is copied, and the contexts are never modified.
+    """
+
+    def __init__(self, *layers):
+        self.layers = [layer for layer in layers if layer is not None]
+
+    def __getitem__(self, key):
+        for layer in self.layers:
+            if key in layer:
+                return layer[key]
+
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        for layer in self.layers:
+            if key in layer:
+                return True
+
+        return False
+
+    def __iter__(self):
+        seen = set()
+
+        for layer in self.layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return len(set().union(*self.layers))
+
+    def copy(self):
+        """
+        Return the merged context as a dict
+
+        Jinja copies the context when it rewrites a template error's traceback.
+
+        :return: a dict
+        """
+        return dict(self)
+
+    def __repr__(self):
+        return u'<{0} {1!r}>'.format(self.__class__.__name__, self.layers)
+
+
+class RenderView(ContextView, MutableMapping):
+    """
+    A ContextView which renders a template, with an empty dict as its first layer.
+
+    Assignments, such as those made by before_render_template receivers, land
+    in the first layer, so the contexts below are never modified.
+    """
+
+    def __init__(self, *layers):
+        super(RenderView, self).__init__({}, *layers)
+
+    def __setitem__(self, key, value):
+        self.layers[0][key] = value
+
+    def __delitem__(self, key):
+        del self.layers[0][key]
+
+
+def flatten(context, prefix=u'', exclude=()):
+    """
+    Flatten nested context into a dict of dotted keys
+
+    {page: {header: {title: Title}}} --> {page.header.title: Title}
+
+    :param context: the context to flatten
+    :param prefix: prepended to every key
+    :param exclude: top-level keys to skip
+    :return: the flattened context
+    """
+    flat = {}
+
+    for key in context:
+
+        if key in exclude:
+            continue
+
+        value = context[key]
+        dotted = u'{0}{1}'.format(prefix, key)
+
+        if isinstance(value, Mapping):
+            flat.update(flatten(value, dotted + u'.'))
+        else:
+            flat[dotted] = value
+
+    return flat
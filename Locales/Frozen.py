@@ -0,0 +1,48 @@
+# -*- coding: UTF-8 -*- #
+
+
+class FrozenDict(dict):
+    """
+    A read-only dict.
+
+    Behaves like a dict for lookups, so templates and views are unaffected,
+    but raises TypeError on any attempt to modify it.
+    """
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(u'{0} is read-only'.format(self.__class__.__name__))
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __hash__(self):
+        return id(self)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
+def freeze(value):
+    """
+    Return a read-only copy of a parsed context
+
+    dicts become FrozenDicts and lists become tuples, recursively.
+
+    :param value: the context
+    :return: the frozen context
+    """
+    if isinstance(value, FrozenDict):
+        return value
+
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+
+    return value
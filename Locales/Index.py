@@ -0,0 +1,130 @@
+# -*- coding: UTF-8 -*- #
+
+import os
+from threading import RLock
+
+
+class ContextIndex(object):
+    """
+    An index of the files within the context folder.
+
+    The folder is scanned once, after which (path, locale) pairs are resolved
+    to concrete files with dict lookups. Misses are remembered too, so a
+    missing localized variant never costs a failed open().
+    """
+
+    def __init__(self, root_path, context_folder=u'context'):
+
+        self.root_path = root_path
+        self.context_folder = context_folder
+
+        # relative paths of the files within the context folder
+        self._files = None
+
+        # directory --> mtime, used to detect changes
+        self._dirs = {}
+
+        # (path, locale) --> absolute path, or None if not found
+        self._resolved = {}
+
+        self._lock = RLock()
+
+    @property
+    def folder(self):
+        """
+        Return the absolute path of the context folder
+
+        :return: the path
+        """
+        return os.path.join(self.root_path, self.context_folder)
+
+    def build(self):
+        """
+        Scan the context folder
+
+        Hidden directories, such as the .cc json cache, are skipped.
+
+        :return: None
+        """
+        files = set()
+        dirs = {self.root_path: _mtime(self.root_path)}
+
+        for dirpath, dirnames, filenames in os.walk(self.folder):
+
+            dirnames[:] = [d for d in dirnames if not d.startswith(u'.')]
+            dirs[dirpath] = _mtime(dirpath)
+
+            for filename in filenames:
+                files.add(os.path.relpath(os.path.join(dirpath, filename), self.folder))
+
+        with self._lock:
+            self._files = files
+            self._dirs = dirs
+            self._resolved = {}
+
+    def stale(self):
+        """
+        Check whether files have been added or removed since the last scan
+
+        :return: True if the index should be rebuilt
+        """
+        if self._files is None:
+            return True
+
+        for dirpath, mtime in self._dirs.items():
+            if _mtime(dirpath) != mtime:
+                return True
+
+        return False
+
+    def resolve(self, path, locale, candidates):
+        """
+        Return the file which path resolves to for locale.
+
+        Candidates are tried in order relative to the context folder, then
+        path is tried relative to the root path.
+
+        :param path: the requested path
+        :param locale: the current locale
+        :param candidates: relative paths to try within the context folder
+        :return: the absolute path, or None if no file was found
+        """
+        key = (path, locale)
+
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        if self._files is None:
+            self.build()
+
+        resolved = None
+
+        for candidate in candidates:
+            if os.path.normpath(candidate) in self._files:
+                resolved = os.path.join(self.folder, candidate)
+                break
+
+        else:
+            alt = os.path.join(self.root_path, path)
+
+            if os.path.isfile(alt):
+                resolved = alt
+
+        self._resolved[key] = resolved
+
+        return resolved
+
+    def __iter__(self):
+        if self._files is None:
+            self.build()
+
+        return iter(sorted(self._files))
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
@@ -4,21 +4,49 @@ import codecs
 import yaml
 import os
 import errno
+import marshal
+import mmap
+import struct
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+# use the libyaml parser if pyyaml was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+    YAML_BACKEND = u'libyaml'
+
+except ImportError:
+    from yaml import SafeLoader
+    YAML_BACKEND = u'python'
 
 from flask import json
 
+from Contexts import LazyContext
+
 
 def yaml_loader(cls, path):
     """
     Load localized context from a yaml file
 
+    The file is parsed with the safe loader, using libyaml when it is available (see YAML_BACKEND).
+
     :param cls: placeholder for class
     :param path: the path to load from
     :return: the context
     """
 
-    with codecs.open(path, u'r', u'utf-8') as infile:
-        context = yaml.load(infile)
+    with open(path, u'rb') as infile:
+        context = yaml.load(infile, Loader=SafeLoader)
 
     return context
 
@@ -51,33 +79,490 @@ def json_caching_yaml_loader(cls, yaml_path):
     :return: the context
     """
 
-    path_list = yaml_path.replace(u'.yaml', u'.json').rsplit(os.sep, 1)
-    path_list.insert(len(path_list) - 1, u'.cc')
-    json_path = os.path.join(*path_list)
+    json_path = _cache_path(yaml_path, u'.json')
 
-    # if json does not exist, or
-    # if yaml file has been modified since json was written
-    # then update the json
-    if not os.path.exists(json_path) or os.path.getmtime(yaml_path) > os.path.getmtime(json_path):
+    return _load_through_cache(cls, yaml_path, json_path, json_loader, _dump_json)
 
-        # load yaml
-        context = yaml_loader(cls, yaml_path)
 
-        # create cache directory, if needed
-        json_dir = os.path.dirname(json_path)
+def _dump_json(context):
+    data = json.dumps(context)
+
+    if isinstance(data, unicode):
+        data = data.encode(u'utf-8')
+
+    return data
+
+
+# compiled context header: magic, format version, serializer, python version
+COMPILED_HEADER = struct.Struct(u'<3sBcBB')
+COMPILED_MAGIC = b'LCC'
+COMPILED_VERSION = 1
+
+# serializers
+_MARSHAL = b'm'
+_PICKLE = b'p'
+
+
+def compile_context(context):
+    """
+    Serialize context to the compiled format
+
+    marshal is used when possible since it is fastest to load, falling back to
+    pickle for types marshal can't handle, such as dates. The Python version is
+    recorded, since marshal output is only valid for the version that wrote it.
+
+    :param context: the context
+    :return: the compiled context
+    """
+    serializer, body = _serialize(context)
+
+    return _header(COMPILED_MAGIC, serializer) + body
+
+
+def decompile_context(data):
+    """
+    Deserialize context from the compiled format
+
+    :param data: the compiled context
+    :return: the context
+    :raises ValueError: if data was not compiled by this version of Locales and Python
+    """
+    serializer = _check_header(data, COMPILED_MAGIC)
+
+    return _deserialize(serializer, data[COMPILED_HEADER.size:])
+
+
+def _serialize(value):
+    """
+    Serialize a value with marshal, or pickle if marshal can't handle it
+
+    :param value: the value
+    :return: the serializer used, and the serialized value
+    """
+    try:
+        return _MARSHAL, marshal.dumps(value)
+
+    except ValueError:
+        return _PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _deserialize(serializer, body):
+    """
+    Deserialize a value serialized by _serialize
+
+    :param serializer: the serializer used
+    :param body: the serialized value
+    :return: the value
+    """
+    if serializer == _MARSHAL:
+        return marshal.loads(body)
+
+    return pickle.loads(body)
+
 
-        if not os.path.exists(json_dir):
+def _header(magic, serializer):
+    """
+    Return the header for a compiled file
+
+    :param magic: identifies the format
+    :param serializer: the serializer used
+    :return: the header
+    """
+    return COMPILED_HEADER.pack(
+        magic,
+        COMPILED_VERSION,
+        serializer,
+        sys.version_info[0],
+        sys.version_info[1]
+    )
+
+
+def _check_header(data, magic):
+    """
+    Check the header of a compiled file
+
+    :param data: the compiled file
+    :param magic: the expected format
+    :return: the serializer used
+    :raises ValueError: if data is not in the expected format, or was compiled by another version of Locales or Python
+    """
+    try:
+        _magic, version, serializer, major, minor = COMPILED_HEADER.unpack_from(data)
+    except struct.error:
+        raise ValueError(u'Not a compiled context')
+
+    if _magic != magic or version != COMPILED_VERSION or (major, minor) != sys.version_info[:2]:
+        raise ValueError(u'Compiled context is from another version')
+
+    return serializer
+
+
+def compiled_loader(cls, path):
+    """
+    Load localized context from a compiled file
+
+    :param cls: placeholder for class
+    :param path: the path to load from
+    :return: the context
+    """
+
+    with open(path, u'rb') as infile:
+        data = infile.read()
+
+    return decompile_context(data)
+
+
+def compile_yaml(yaml_path):
+    """
+    Compile a yaml file into .cc/
+
+    :param yaml_path: the path to the context file
+    :return: the context, and the path to the compiled file
+    """
+
+    compiled_path = _cache_path(yaml_path, u'.lcc')
+
+    context = yaml_loader(None, yaml_path)
+
+    _write_atomic(compiled_path, compile_context(context))
+
+    return context, compiled_path
+
+
+def compiled_caching_yaml_loader(cls, yaml_path):
+    """
+    Load localized context from a yaml, and cache to the compiled format
+
+    Works like json_caching_yaml_loader, but loading the cached copy is a single
+    read and a fast deserialize. Compiled files are cached in .cc/.
+
+    :param cls: placeholder for class
+    :param yaml_path: the path to the context file.
+    :return: the context
+    """
+
+    compiled_path = _cache_path(yaml_path, u'.lcc')
+
+    return _load_through_cache(cls, yaml_path, compiled_path, compiled_loader, compile_context)
+
+
+def _load_through_cache(cls, yaml_path, cache_path, read, dump):
+    """
+    Load context from a cache file, rebuilding it from yaml if it is missing or stale
+
+    When many processes start cold, only one rebuilds the cache files of a
+    folder at a time. The others serve the previous version if there is one,
+    or wait for the rebuild. The lock is a single .lock file within .cc/.
+
+    :param cls: placeholder for class
+    :param yaml_path: the path to the context file
+    :param cache_path: the path to the cache file
+    :param read: loads context from the cache file
+    :param dump: serializes context for the cache file
+    :return: the context
+    """
+
+    if _is_fresh(yaml_path, cache_path):
+        try:
+            return read(cls, cache_path)
+        except (ValueError, EOFError):
+            # corrupt, or written by another version
+            pass
+
+    lock = _FileLock(_lock_path(cache_path))
+
+    if not lock.acquire(blocking=False):
+
+        # another process is rebuilding, serve the previous version
+        try:
+            return read(cls, cache_path)
+        except (IOError, OSError, ValueError, EOFError):
+            pass
+
+        lock.acquire()
+
+    try:
+        # it may have been rebuilt while waiting for the lock
+        if _is_fresh(yaml_path, cache_path):
             try:
-                os.makedirs(json_dir)
-            except OSError as e:
-                if e.errno != errno.EEXIST:
-                    raise
+                return read(cls, cache_path)
+            except (ValueError, EOFError):
+                pass
+
+        context = yaml_loader(cls, yaml_path)
 
-        # write json
-        with codecs.open(json_path, u'w', u'utf-8') as outfile:
-            json.dump(context, outfile)
+        _write_atomic(cache_path, dump(context))
 
-        # return the context
         return context
 
-    return json_loader(cls, json_path)
+    finally:
+        lock.release()
+
+
+def _is_fresh(yaml_path, cache_path):
+    """
+    Check whether a cache file is at least as new as the yaml it was built from
+
+    :param yaml_path: the path to the context file
+    :param cache_path: the path to the cache file
+    :return: True if the cache file can be used
+    """
+    try:
+        return os.path.getmtime(yaml_path) <= os.path.getmtime(cache_path)
+    except OSError:
+        return False
+
+
+def _write_atomic(path, data):
+    """
+    Write data to path, so that readers see either the old or the new file, never a partial one
+
+    :param path: the path to write
+    :param data: the bytes to write
+    :return: None
+    """
+
+    folder = os.path.dirname(path)
+
+    _makedirs(folder)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=u'.', suffix=u'.tmp', dir=folder)
+
+    try:
+        with os.fdopen(fd, u'wb') as outfile:
+            outfile.write(data)
+
+        # mkstemp creates files readable only by the owner
+        os.chmod(tmp_path, 0o644)
+
+        _replace(tmp_path, path)
+
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _replace(src, dst):
+    """
+    Rename src to dst, replacing dst if it exists
+
+    :param src: the source path
+    :param dst: the destination path
+    :return: None
+    """
+    try:
+        os.rename(src, dst)
+
+    except OSError:
+        # windows won't rename over an existing file
+        if not os.path.exists(dst):
+            raise
+
+        os.remove(dst)
+        os.rename(src, dst)
+
+
+class _FileLock(object):
+    """
+    An exclusive, inter-process lock on a file
+
+    Without fcntl, as on windows, locking is a no-op.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking=True):
+        """
+        Acquire the lock
+
+        :param blocking: wait for the lock if it is held elsewhere
+        :return: True if the lock was acquired
+        """
+        if fcntl is None:
+            return True
+
+        _makedirs(os.path.dirname(self.path))
+
+        self._file = open(self.path, u'a')
+
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        except IOError as e:
+            self._file.close()
+            self._file = None
+
+            if e.errno in (errno.EAGAIN, errno.EACCES):
+                return False
+
+            raise
+
+        return True
+
+    def release(self):
+        """
+        Release the lock
+
+        :return: None
+        """
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def _cache_path(path, extension):
+    """
+    Return the path of a cache file for path
+
+    'context/en/page.yaml' --> 'context/en/.cc/page<extension>'
+
+    :param path: the path to the context file
+    :param extension: the extension of the cache file
+    :return: the path to the cache file
+    """
+
+    path_list = path.replace(u'.yaml', extension).rsplit(os.sep, 1)
+    path_list.insert(len(path_list) - 1, u'.cc')
+
+    return os.path.join(*path_list)
+
+
+def _lock_path(cache_path):
+    """
+    Return the path of the lock guarding a cache file, shared by its .cc folder
+
+    'context/en/.cc/page.lcc' --> 'context/en/.cc/.lock'
+
+    :param cache_path: the path to the cache file
+    :return: the path to the lock file
+    """
+
+    return os.path.join(os.path.dirname(cache_path), u'.lock')
+
+
+def _makedirs(path):
+    """
+    Create a directory, if needed
+
+    :param path: the directory
+    :return: None
+    """
+
+    if not os.path.exists(path):
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+
+# indexed context: header, index size, index, then each top-level section
+INDEXED_MAGIC = b'LCI'
+INDEX_SIZE = struct.Struct(u'<I')
+
+
+def compile_indexed_context(context):
+    """
+    Serialize context to the indexed format
+
+    Each top-level section is serialized separately, behind an index of
+    offsets, so that sections can be decoded one at a time.
+
+    :param context: the context, which must be a mapping
+    :return: the compiled context
+    """
+    if not isinstance(context, dict):
+        raise ValueError(u'Only mappings can be indexed')
+
+    index = {}
+    sections = []
+    offset = 0
+
+    for key, value in context.items():
+        serializer, body = _serialize(value)
+
+        index[key] = (serializer, offset, offset + len(body))
+        sections.append(body)
+
+        offset += len(body)
+
+    index = marshal.dumps(index)
+
+    return b''.join([_header(INDEXED_MAGIC, _MARSHAL), INDEX_SIZE.pack(len(index)), index] + sections)
+
+
+def lazy_loader(cls, path):
+    """
+    Load localized context from an indexed file, as a LazyContext
+
+    The file is memory-mapped, and sections are decoded on first access.
+
+    :param cls: placeholder for class
+    :param path: the path to load from
+    :return: the context
+    """
+
+    with open(path, u'rb') as infile:
+        try:
+            data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            raise ValueError(u'Not a compiled context')
+
+    _check_header(data, INDEXED_MAGIC)
+
+    start = COMPILED_HEADER.size + INDEX_SIZE.size
+    size, = INDEX_SIZE.unpack_from(data, COMPILED_HEADER.size)
+
+    index = marshal.loads(data[start:start + size])
+
+    return LazyContext(data, index, start + size, _deserialize)
+
+
+def lazy_caching_yaml_loader(cls, yaml_path):
+    """
+    Load localized context from a yaml as a LazyContext, caching to the indexed format
+
+    Works like compiled_caching_yaml_loader, but top-level sections are only
+    decoded when they are used. Indexed files are cached in .cc/. When the
+    cache is rebuilt, the freshly parsed context is returned instead. Contexts
+    that aren't mappings (empty files, lists, scalars) are cached compiled whole.
+
+    :param cls: placeholder for class
+    :param yaml_path: the path to the context file.
+    :return: the context
+    """
+
+    indexed_path = _cache_path(yaml_path, u'.lci')
+
+    return _load_through_cache(cls, yaml_path, indexed_path, _lazy_or_compiled_loader, _compile_indexed_or_whole)
+
+
+def _compile_indexed_or_whole(context):
+    """
+    Serialize context to the indexed format, or compile it whole if it isn't a mapping
+
+    :param context: the context
+    :return: the compiled context
+    """
+    if isinstance(context, dict):
+        return compile_indexed_context(context)
+
+    return compile_context(context)
+
+
+def _lazy_or_compiled_loader(cls, path):
+    """
+    Load an indexed file, or a compiled file holding a context that isn't a mapping
+
+    :param cls: placeholder for class
+    :param path: the path to load from
+    :return: the context
+    """
+    try:
+        return lazy_loader(cls, path)
+    except ValueError:
+        return compiled_loader(cls, path)
@@ -1,8 +1,38 @@
 # -*- coding: UTF-8 -*- #
 
-from flask import g, session, render_template, request, current_app
+from flask import g, session, request, current_app, has_request_context
+from flask.signals import before_render_template, template_rendered
+from jinja2 import FileSystemBytecodeCache
+from jinja2.utils import concat
+from multiprocessing.pool import ThreadPool
+from threading import RLock
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+from timeit import default_timer
+import cPickle as pickle
+import gc
+import hashlib
 import os
-from Loaders import yaml_loader
+from Loaders import yaml_loader, _makedirs
+from Cache import LRUCache, ContextCache, MemoryRenderCache, FileRenderCache, signature
+from Contexts import ContextView, RenderView, flatten
+from Index import ContextIndex
+from Watchers import create_watcher, WATCHERS
+from Negotiation import Negotiator, fallback_chains, fallback_chain
+from Packs import Pack, write_pack
+from Signals import context_loaded, template_selected, locale_resolved, has_receivers
+from Stats import MemoryStats
+
+try:
+    from Commands import cli
+except ImportError:
+    # flask < 0.11 has no cli
+    cli = None
+
+# sentinel for cache misses
+_missing = object()
 
 
 class Locales(object):
@@ -13,6 +43,9 @@ class Locales(object):
     context_loader = yaml_loader
     context_folder = u'context'
 
+    # files within the context folder that context_loader can load
+    context_extensions = (u'.yaml', u'.yml', u'.json')
+
     def __init__(self, app=None):
 
         # placeholders
@@ -20,7 +53,60 @@ class Locales(object):
         self._tags = []
         self.tag_map = {}
 
-        self._current = None
+        # locale --> the locales to try, in order
+        self.chains = {}
+        self._fallbacks = None
+
+        # every locale that can appear in a chain
+        self._known = set()
+
+        self._negotiator = None
+
+        # without a session, the locale comes from the url or a header
+        self.stateless = False
+        self.url_arg = u'locale'
+        self.header = None
+
+        self.cache = ContextCache()
+        self.index = None
+        self.watcher = None
+
+        # rendered templates, see Cache.MemoryRenderCache
+        self.render_cache = None
+
+        # locale --> Pack, or None to load loose files
+        self.packs = None
+
+        # stats sink, see Stats.MemoryStats
+        self.stats = None
+
+        # Accept-Language header --> best matching locale
+        self._accept_cache = LRUCache(256)
+
+        # (path, locale) --> localized path
+        self._localified = {}
+
+        # (path, locale) --> paths to try within the context folder
+        self._paths = {}
+
+        # (paths, locale) --> the merged context of load_many
+        self._merged = LRUCache()
+
+        # (template names, locale) --> candidate templates
+        self._candidates = {}
+
+        # candidate templates --> the template that was found
+        self._selected = {}
+
+        # locale --> flattened context, for t()
+        self._catalogs = {}
+
+        # thread pool for load_async, and the loads in progress
+        self._pool = None
+        self._pool_size = 4
+        self._pending = {}
+
+        self._lock = RLock()
 
         if app is not None:
             self.init_app(app)
@@ -29,6 +115,14 @@ class Locales(object):
 
         app.before_request(self.before_request)
 
+        if not hasattr(app, u'extensions'):
+            app.extensions = {}
+
+        app.extensions[u'locales'] = self
+
+        if cli is not None:
+            app.cli.add_command(cli)
+
         locales = app.config.get(u'LOCALES', [(u'en', u'EN')])
 
         self._allowed = [l[0] for l in locales]
@@ -36,17 +130,155 @@ class Locales(object):
 
         self.tag_map = dict(zip(self._allowed, self._tags))
 
+        # fallbacks and Accept-Language matching are worked out once, up front
+        self._fallbacks = app.config.get(u'LOCALES_FALLBACKS', None)
+        self.chains = fallback_chains(self._allowed, self._fallbacks)
+        self._known = set(locale for chain in self.chains.values() for locale in chain)
+        self._negotiator = Negotiator(self._allowed)
+
+        self.stateless = app.config.get(u'LOCALES_STATELESS', False)
+        self.url_arg = app.config.get(u'LOCALES_URL_ARG', u'locale')
+        self.header = app.config.get(u'LOCALES_HEADER', None)
+
+        if self.stateless:
+            app.url_defaults(self.url_defaults)
+            app.after_request(self.after_request)
+
+        # template globals and filters are installed once, they resolve
+        # the current locale when called
+        app.jinja_env.globals[u'current_locale'] = self.get_current
+        app.jinja_env.globals[u'next_locale_tag'] = self.get_next_tag
+
+        app.jinja_env.filters[u'tag'] = self.tag
+
+        app.jinja_env.globals[u't'] = self.t
+        app.jinja_env.filters[u't'] = self.t
+
+        # compiled templates, shared by every worker
+        bytecode_cache = app.config.get(u'LOCALES_BYTECODE_CACHE', None)
+
+        if bytecode_cache and app.jinja_env.bytecode_cache is None:
+
+            if bytecode_cache is True:
+                bytecode_cache = os.path.join(app.instance_path, u'jinja')
+
+            _makedirs(bytecode_cache)
+
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_cache)
+
+        # context cache
+        self.cache.maxsize = app.config.get(u'LOCALES_CACHE_SIZE', 128)
+        self.cache.ttl = app.config.get(u'LOCALES_CACHE_TTL', None)
+
+        self._merged.maxsize = self.cache.maxsize
+
+        self._pool_size = app.config.get(u'LOCALES_ASYNC_THREADS', 4)
+
+        # rendered templates
+        render_cache = app.config.get(u'LOCALES_RENDER_CACHE', None)
+        render_size = app.config.get(u'LOCALES_RENDER_CACHE_SIZE', 256)
+        render_ttl = app.config.get(u'LOCALES_RENDER_CACHE_TTL', None)
+
+        if render_cache == u'memory':
+            render_cache = MemoryRenderCache(render_size, render_ttl)
+
+        elif render_cache == u'file':
+            folder = app.config.get(u'LOCALES_RENDER_CACHE_DIR', os.path.join(app.instance_path, u'locales'))
+            render_cache = FileRenderCache(folder, render_size, render_ttl)
+
+        elif isinstance(render_cache, basestring):
+            raise ValueError(u'Unknown render cache: {0}'.format(render_cache))
+
+        self.render_cache = render_cache
+
+        # instrumentation
+        stats = app.config.get(u'LOCALES_STATS', False)
+        metrics_url = app.config.get(u'LOCALES_METRICS_URL', None)
+
+        if stats is True or (metrics_url and not stats):
+            stats = MemoryStats()
+
+        self.stats = stats or None
+
+        if metrics_url:
+            if not hasattr(self.stats, u'prometheus'):
+                raise ValueError(u'LOCALES_METRICS_URL requires LOCALES_STATS to have a prometheus() method')
+
+            app.add_url_rule(metrics_url, u'locales_metrics', self.metrics)
+
+        # context resolution index, built on first use
+        self.index = ContextIndex(app.root_path, self.context_folder)
+
+        # serve context from the packs built by flask locales pack
+        if app.config.get(u'LOCALES_PACKS', False):
+            self.packs = {}
+
+        # optionally parse all context up front, before serving requests
+        if app.config.get(u'LOCALES_FREEZE', False):
+            count, elapsed = self.freeze(app.config.get(u'LOCALES_WARM_THREADS', None))
+            app.logger.info(u'Locales: loaded and froze {0} contexts in {1:.3f}s'.format(count, elapsed))
+
+        elif app.config.get(u'LOCALES_WARM', False):
+            count, elapsed = self.warm(app.config.get(u'LOCALES_WARM_THREADS', None))
+            app.logger.info(u'Locales: loaded {0} contexts in {1:.3f}s'.format(count, elapsed))
+
+        # optionally watch for changes, instead of checking the filesystem on every load
+        watch = app.config.get(u'LOCALES_WATCH', None)
+
+        if watch is True:
+            watch = u'auto'
+
+        if watch and watch not in WATCHERS:
+            raise ValueError(u'Unknown watcher: {0}'.format(watch))
+
+        if watch:
+
+            # start in the worker, after blueprints have been registered; files
+            # are checked on every load until then
+            app.before_first_request(
+                lambda: self.watch(app, watch, app.config.get(u'LOCALES_WATCH_INTERVAL', 1.0))
+            )
+
     def before_request(self):
 
         # make Locales available on g
         g.locales = self
 
-        # template globals
-        current_app.jinja_env.globals[u'current_locale'] = self.get_current
-        current_app.jinja_env.globals[u'next_locale_tag'] = self.get_next_tag
+    def url_defaults(self, endpoint, values):
+        """
+        In stateless mode, keep the current locale in urls built for endpoints that take it
+
+        Outside a request, as in emails or CLI jobs, there is no current locale to keep.
+
+        :param endpoint: the endpoint
+        :param values: the url values
+        :return: None
+        """
+        if not has_request_context():
+            return
+
+        if self.url_arg in values or not current_app.url_map.is_endpoint_expecting(endpoint, self.url_arg):
+            return
+
+        values[self.url_arg] = self.current
+
+    def after_request(self, response):
+        """
+        In stateless mode, let caches know which headers the response depends on
+
+        :param response: the response
+        :return: the response
+        """
+        source = getattr(g, u'_locales_source', None)
+
+        if source is not None and source != u'url':
+
+            if self.header is not None:
+                response.vary.add(self.header)
 
-        # template filters
-        current_app.jinja_env.filters[u'tag'] = self.tag
+            response.vary.add(u'Accept-Language')
+
+        return response
 
     @property
     def default(self):
@@ -65,23 +297,23 @@ class Locales(object):
         :return: the current locale
         """
 
-        if self._current is None:
+        # the locale is resolved once per request, and kept on g
+        locale = getattr(g, u'_locales_current', None)
 
-            # get the locale from the session
-            locale = session.get(u'locale', None)
+        if locale is None:
+            locale, source = self._resolve()
 
-            # if locale has not been defined, get best match from the browser
-            if locale is None:
-                locale = request.accept_languages.best_match(self._allowed)
+            # derived locales are not written to the session
+            g._locales_current = locale
+            g._locales_source = source
 
-            # if I still cant figure it out, use the default
-            if locale is None:
-                locale = self.default
+            if self.stats is not None:
+                self.stats.incr(u'locale_resolutions', source=source)
 
-            # set the current locale
-            self.current = locale
+            if has_receivers(locale_resolved):
+                locale_resolved.send(self, locale=locale, source=source)
 
-        return self._current
+        return locale
 
     @current.setter
     def current(self, locale):
@@ -91,8 +323,69 @@ class Locales(object):
         :param locale: the desired locale
         :return: None
         """
-        session[u'locale'] = locale
-        self._current = locale
+
+        # only write real changes, since any write re-sends the session
+        if not self.stateless and session.get(u'locale', None) != locale:
+            session[u'locale'] = locale
+
+        g._locales_current = locale
+
+    def _resolve(self):
+        """
+        Work out the locale for the current request
+
+        :return: the locale, and where it came from
+        """
+        if self.stateless:
+
+            # get the locale from the url
+            locale = (request.view_args or {}).get(self.url_arg) or request.args.get(self.url_arg)
+
+            if locale in self._allowed:
+                return locale, u'url'
+
+            # or from a header
+            if self.header is not None:
+                locale = request.headers.get(self.header)
+
+                if locale in self._allowed:
+                    return locale, u'header'
+
+        else:
+            # get the locale from the session
+            locale = session.get(u'locale', None)
+
+            if locale is not None:
+                return locale, u'session'
+
+        # if locale has not been defined, get best match from the browser
+        locale = self._best_match(request.headers.get(u'Accept-Language'))
+
+        if locale is not None:
+            return locale, u'accept_language'
+
+        # if I still cant figure it out, use the default
+        return self.default, u'default'
+
+    def _best_match(self, header):
+        """
+        Return the allowed locale that best matches an Accept-Language header
+
+        Results are cached on the raw header, since browsers send only a handful of distinct values.
+
+        :param header: the Accept-Language header
+        :return: the best matching locale, or None
+        """
+        if not header:
+            return None
+
+        locale = self._accept_cache.get(header, _missing)
+
+        if locale is _missing:
+            locale = self._negotiator.match(header)
+            self._accept_cache.set(header, locale)
+
+        return locale
 
     @property
     def next(self):
@@ -131,64 +424,327 @@ class Locales(object):
         Render localed templates.
 
         :param template_name_or_list: identical to Flask.render_template
-        :param context: name of file containing localized context information or None
+        :param context: name of file containing localized context information, a list of names, or None
         :param ctx: - identical to Flask.render_template
         :return: the rendered template
         """
 
-        if isinstance(template_name_or_list, basestring):
-            template_name_or_list = [template_name_or_list]
+        return self._render_template(self._select_template(template_name_or_list), context, ctx)
+
+    def render_template_cached(self, template_name_or_list, context=None, **ctx):
+        """
+        Render localed templates, keeping the output in the render cache
+
+        Only for templates which depend on nothing but the context files and ctx. Identical
+        to render_template when no render cache is configured.
+
+        :param template_name_or_list: identical to Flask.render_template
+        :param context: name of file containing localized context information, a list of names, or None
+        :param ctx: - identical to Flask.render_template
+        :return: the rendered template
+        """
+
+        template_name = self._select_template(template_name_or_list)
+
+        key = None
 
-        localified = [self._localify_path(name) for name in template_name_or_list] + template_name_or_list
+        if self.render_cache is not None:
+            key = self._render_key(template_name, context, ctx)
+
+            if key is not None:
+                rv = self.render_cache.get(key)
+
+                if self.stats is not None:
+                    self.stats.incr(u'render_cache', result=u'miss' if rv is None else u'hit')
+
+                if rv is not None:
+                    return rv
+
+        rv = self._render_template(template_name, context, ctx)
+
+        if key is not None:
+            self.render_cache.set(key, rv)
+
+        return rv
+
+    def _render_template(self, template_name, context, ctx):
+        """
+        Load the context files, and render the selected template
+
+        :param template_name: the selected template, or the list of candidates
+        :param context: the context path, a list of paths, or None
+        :param ctx: the keyword context
+        :return: the rendered template
+        """
 
         # if in debug and context is not None
         # render the static context
-        if context is not None:
-            ctx.update(self.load(context))
+        contexts = ()
+
+        if isinstance(context, basestring):
+            contexts = (self.load(context),)
+
+        elif context is not None:
+            contexts = self.load_many(context).layers
 
         # now handle any localized content within ctx
-        ctx = self._localify_context(**ctx)
+        view = self._localify_context(*contexts, **ctx)
+
+        return self._render(template_name, view)
+
+    def _render_key(self, template_name, path, ctx):
+        """
+        Return the render cache key for a render_template_cached call
+
+        The key is made of the template, the locale, the context files and their
+        signatures, and a hash of the keyword context. When Jinja auto-reloads,
+        templates it extends, includes or imports may change at any time, so
+        nothing is cached.
+
+        :param template_name: the selected template, or the list of candidates
+        :param path: the context path, a list of paths, or None
+        :param ctx: the keyword context
+        :return: the key, or None if the call can't be cached
+        """
+        if current_app.jinja_env.auto_reload:
+            return None
+
+        locale = self.current
+
+        # keyword context is hashed, so anything that can't be pickled isn't cached
+        kwargs = None
+
+        if ctx:
+            try:
+                kwargs = hashlib.sha1(pickle.dumps(sorted(ctx.items()), pickle.HIGHEST_PROTOCOL)).hexdigest()
+            except Exception:
+                return None
+
+        context = None
+
+        if path is not None:
+            self._check_index()
+
+            context = self._versions((path,) if isinstance(path, basestring) else tuple(path), locale)
+
+            if context is None:
+                return None
+
+        return template_name, locale, context, kwargs
+
+    def _render(self, template_name_or_list, context):
+        """
+        Render a template with a ContextView, without copying it into a dict
+
+        Otherwise identical to flask.render_template: context processors are
+        applied, and the template signals are sent.
+
+        :param template_name_or_list: the template name, or list of candidates
+        :param context: the ContextView to render with
+        :return: the rendered template
+        """
+        app = current_app._get_current_object()
+        template = app.jinja_env.get_or_select_template(template_name_or_list)
+
+        # as with Flask, the view's context takes precedence over context processors
+        processors = {}
+        app.update_template_context(processors)
+
+        context = RenderView(*(context.layers + [processors, template.globals]))
+
+        before_render_template.send(app, template=template, context=context)
+
+        try:
+            # a shared context is used as is, rather than copied into a dict
+            rv = concat(template.root_render_func(template.new_context(context, shared=True)))
+        except Exception:
+            rv = template.environment.handle_exception()
+
+        template_rendered.send(app, template=template, context=context)
+
+        return rv
+
+    def _select_template(self, template_name_or_list):
+        """
+        Return the name of the template to render for the current locale
+
+        The winning candidate is cached, so templates without a localized
+        version don't cost a failed loader search on every render. When Jinja
+        auto-reloads templates, a localized version may appear at any time, so
+        all candidates are passed through to be searched as usual.
+
+        :param template_name_or_list: identical to Flask.render_template
+        :return: the template name, or the list of candidates
+        """
+        start = default_timer()
+
+        template_name = self._find_template(template_name_or_list)
+
+        if self.stats is not None or has_receivers(template_selected):
+            elapsed = default_timer() - start
+
+            if self.stats is not None:
+                self.stats.timing(u'template_select', elapsed)
+
+            template_selected.send(self, template=template_name, locale=self.current, elapsed=elapsed)
+
+        return template_name
+
+    def _find_template(self, template_name_or_list):
+        candidates = self._template_candidates(template_name_or_list)
 
-        return render_template(localified, **ctx)
+        jinja_env = current_app.jinja_env
+
+        if jinja_env.auto_reload:
+            return candidates
+
+        try:
+            return self._selected[candidates]
+        except KeyError:
+            pass
+
+        template_name = jinja_env.select_template(candidates).name
+        self._selected[candidates] = template_name
+
+        return template_name
+
+    def _template_candidates(self, template_name_or_list):
+        """
+        Return the templates to try for the current locale, localized names first
+
+        Candidates are computed once per (names, locale) and cached.
+
+        :param template_name_or_list: identical to Flask.render_template
+        :return: a tuple of template names
+        """
+        if isinstance(template_name_or_list, basestring):
+            names = (template_name_or_list,)
+        else:
+            names = tuple(template_name_or_list)
+
+        locale = self.current
+        key = (names, locale)
+
+        try:
+            return self._candidates[key]
+        except KeyError:
+            pass
+
+        candidates = tuple(self._localify(name, _locale) for _locale in self._chain(locale) for name in names) + names
+        self._candidates[key] = candidates
+
+        return candidates
 
     def _localify_path(self, path):
         """
         Takes a template or context path, and returns the path to the
         corresponding localized file (if it exists) according to the current locale.
 
+        :param path: the desired path
+        :return: the localized path
+        """
+        return self._localify(path, self.current)
+
+    def _chain(self, locale):
+        """
+        Return the locales to try for locale, in order
+
+        :param locale: the locale
+        :return: a tuple of locales
+        """
+        try:
+            return self.chains[locale]
+        except KeyError:
+            pass
+
+        # a locale which isn't allowed, from an old session perhaps
+        chain = self.chains[locale] = fallback_chain(locale, self.default, self._fallbacks)
+
+        return chain
+
+    def _attempts(self, path, locale):
+        """
+        Return the paths to try within the context folder, for path and locale
+
+        The localized path for each locale in the fallback chain, then path itself.
+
+        :param path: the desired path
+        :param locale: the locale
+        :return: a tuple of paths
+        """
+        key = (path, locale)
+
+        try:
+            return self._paths[key]
+        except KeyError:
+            pass
+
+        attempts = []
+
+        for attempt in [self._localify(path, _locale) for _locale in self._chain(locale)] + [path]:
+            if attempt not in attempts:
+                attempts.append(attempt)
+
+        attempts = self._paths[key] = tuple(attempts)
+
+        return attempts
+
+    def _localify(self, path, locale):
+        """
+        Takes a template or context path, and returns the path to the
+        corresponding localized file (if it exists) according to locale.
+
         Example 1:
         'template.html' --> '<loc>/template.html'
 
         Example 2:
         'blueprint/context.yaml' --> 'blueprint/<loc>/context.yaml'
 
+        Results are cached, so the string handling runs once per (path, locale).
+
         :param path: the desired path
+        :param locale: the locale
         :return: the localized path
         """
+        key = (path, locale)
+
+        try:
+            return self._localified[key]
+        except KeyError:
+            pass
 
         # if the requested path is at the root level, look for locales under the root
         if u'/' not in path:
-            return os.path.join(g.locales.current, path)
+            localified = os.path.join(locale, path)
 
         # if a pre-localed path was passed, just return it
 
         # - if using blueprints:
-        if u'/{0}/'.format(g.locales.current) in path:
-            return path
+        elif u'/{0}/'.format(locale) in path:
+            localified = path
 
         # - if not using blueprints
-        if path.startswith(u'{0}/'.format(g.locales.current)):
-            return path
+        elif path.startswith(u'{0}/'.format(locale)):
+            localified = path
 
         # insert the locale into the path
-        path_list = path.rsplit(u'/', 1)
-        path_list.insert(1, g.locales.current)
+        else:
+            path_list = path.rsplit(u'/', 1)
+            path_list.insert(1, locale)
 
-        return os.sep.join(path_list)
+            localified = os.sep.join(path_list)
 
-    def _localify_context(self, **context):
+        self._localified[key] = localified
+
+        return localified
+
+    def _localify_context(self, *contexts, **context):
         """
-        Return the context with any localed content promoted to the top level
+        Return a read-only view of the context with any localed content promoted to the top level
+
+        Nothing is copied: the view searches the current locale's section, then the
+        sections of the locales it falls back to, then the keyword context, then each
+        of contexts, in order.
 
         Example 0: Just pass the locale you want to render
         {greeting: Hello} --> {greeting: Hello}
@@ -196,35 +752,240 @@ class Locales(object):
         Example 1: Pass multiple locales, but use the right one
         {en: {greeting: Hello}, zh_Hans: {greeting: 你好}} --> {greeting: Hello, en: {greeting: Hello}, zh_Hans: {greeting: 你好}}
 
+        :param contexts: loaded contexts, or None
         :param context: the context to render
         :return: the localized context
         """
 
-        if g.locales.current in context:
-            context.update(context.get(g.locales.current))
+        view = ContextView(context, *contexts)
 
-        return context
+        # each context's section for the current locale, then for each fallback
+        view.layers[0:0] = [
+            layer[locale] for locale in self._chain(self.current) for layer in view.layers if locale in layer
+        ]
+
+        return view
 
     def load(self, path):
         """
         Load context from path
 
+        Loaded context is cached, so the returned context is shared and should not be modified.
+
         :param path: the path to load
         :return: the context
         """
+
+        self._check_index()
+
+        return self._load(path, self.current)
+
+    def load_many(self, paths):
+        """
+        Load several context files, and merge them
+
+        Paths are resolved together, and loaded concurrently. The merged context
+        is cached as a unit, and checked against the files it was loaded from,
+        so a page made of several files costs a single lookup.
+
+        :param paths: the paths to load, later files taking precedence over earlier ones
+        :return: the merged context, a ContextView
+        """
+        self._check_index()
+
+        locale = self.current
+        paths = tuple(paths)
+        key = (paths, locale)
+
+        versions = self._versions(paths, locale)
+
+        if versions is not None:
+            merged = self._merged.get(key)
+
+            if merged is not None and merged[0] == versions:
+
+                if self.stats is not None:
+                    self.stats.incr(u'context_merge', result=u'hit')
+
+                return merged[1]
+
+        if self.stats is not None:
+            self.stats.incr(u'context_merge', result=u'miss')
+
+        if len(paths) > 1:
+            contexts = self._get_pool().map(lambda path: self._load(path, locale), paths)
+        else:
+            contexts = [self._load(path, locale) for path in paths]
+
+        view = ContextView(*reversed(contexts))
+
+        # files which aren't in the index are loaded, but not cached as a unit
+        if versions is not None:
+            self._merged.set(key, (versions, view))
+
+        return view
+
+    def _versions(self, paths, locale):
+        """
+        Return the file each of paths resolves to, and its signature
+
+        Signatures are only taken when the cache checks files for changes.
+
+        :param paths: the paths
+        :param locale: the locale
+        :return: a tuple of (resolved path, signature), or None if a path isn't in the index
+        """
+        validate = self.cache.validate and not self.cache.frozen
+        versions = []
+
+        pack = self._pack(locale)
+
+        for path in paths:
+
+            if pack is not None and path in pack:
+                versions.append((pack.path, pack.signature))
+                continue
+
+            resolved = self.index.resolve(path, locale, self._attempts(path, locale))
+
+            if resolved is None:
+                return None
+
+            versions.append((resolved, signature(resolved) if validate else None))
+
+        return tuple(versions)
+
+    def load_async(self, path):
+        """
+        Load context from path on a thread pool, so file reads and parsing don't block the caller
+
+        Concurrent calls for the same path and locale share a single load, and
+        loaded context goes through the same cache as load.
+
+        :param path: the path to load
+        :return: an AsyncResult, whose get() returns the context
+        """
+        self._check_index()
+
+        locale = self.current
+        key = (path, locale)
+
+        with self._lock:
+            result = self._pending.get(key)
+
+            if result is None:
+                submitted = []
+
+                def load():
+                    try:
+                        return self._load(path, locale)
+                    finally:
+                        # the lock is held until the result is registered, so a
+                        # fast load can't finish first and leave it behind
+                        with self._lock:
+                            if self._pending.get(key) is submitted[0]:
+                                del self._pending[key]
+
+                result = self._pending[key] = self._get_pool().apply_async(load)
+                submitted.append(result)
+
+        return result
+
+    def _get_pool(self):
+        """
+        Return the thread pool used by load_async, creating it on first use
+
+        The pool is created lazily, since threads don't survive a fork.
+
+        :return: the pool
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self._pool_size)
+
+            return self._pool
+
+    def _check_index(self):
+        """
+        In debug, pick up files as they are added and removed
+
+        :return: None
+        """
+        if self.watcher is None and current_app.debug and self.index.stale():
+            self.index.build()
+
+    def _load(self, path, locale):
+        """
+        Load context from path for locale
+
+        :param path: the path to load
+        :param locale: the locale to load for
+        :return: the context
+        """
+        start = default_timer()
+
+        context, hit, resolved, tier = self._find(path, locale)
+
+        if self.stats is not None or has_receivers(context_loaded):
+            elapsed = default_timer() - start
+
+            if self.stats is not None:
+                self.stats.timing(u'context_load', elapsed, path=path, tier=tier, cache=u'hit' if hit else u'miss')
+
+            context_loaded.send(self, path=path, locale=locale, resolved=resolved, tier=tier, hit=hit, elapsed=elapsed)
+
+        return context
+
+    def _find(self, path, locale):
+        """
+        Resolve path for locale, and load it
+
+        Files are tried in tiers: the localized file within the context folder, then
+        the files of the locales it falls back to, then the common file within the
+        context folder, then path relative to the root. With packs, the locale's
+        pack is tried first.
+
+        :param path: the path to load
+        :param locale: the locale to load for
+        :return: the context, True for a cache hit, the resolved path, and the tier which matched
+        """
+        pack = self._pack(locale)
+
+        if pack is not None and path in pack:
+            return pack.lookup(path) + (pack.path, u'pack')
+
         # build a sequence of paths to try
-        attempts = (self._localify_path(path), path)
+        attempts = self._attempts(path, locale)
+        tiers = (u'locale',) + (u'fallback',) * (len(attempts) - 2) + (u'context',)
+
+        resolved = self.index.resolve(path, locale, attempts)
 
-        for attempt in attempts:
+        if resolved is not None:
+            tier = u'root'
+
+            for attempt, _tier in zip(attempts, tiers):
+                if resolved == os.path.join(self.index.folder, attempt):
+                    tier = _tier
+                    break
+
+            try:
+                return self._load_file(resolved, locale) + (resolved, tier)
+
+            except (IOError, OSError):
+                # the file was removed since the index was built
+                self.index.build()
+
+        # the index found nothing, so let the loader try each path
+        for attempt, tier in zip(attempts, tiers):
 
             try:
                 _path = os.path.join(
-                    current_app.root_path,
+                    self.index.root_path,
                     self.context_folder,
                     attempt
                 )
 
-                return self.context_loader(_path)
+                return self._load_file(_path, locale) + (_path, tier)
 
             except IOError:
                 pass
@@ -234,14 +995,289 @@ class Locales(object):
 
         # if I haven't found the context yet, look for a common context
         # this time I want to raise IOError if I don't find the file
-        context = self.context_loader(
-            os.path.join(
-                current_app.root_path,
-                path
-            )
+        _path = os.path.join(
+            self.index.root_path,
+            path
         )
 
-        return context
+        return self._load_file(_path, locale) + (_path, u'root')
+
+    def _load_file(self, path, locale):
+        """
+        Load context from a resolved path, through the cache
+
+        :param path: the absolute path to load
+        :param locale: the locale to load for
+        :return: the context, and True for a cache hit
+        """
+        return self.cache.lookup(path, locale, self.context_loader)
+
+    def watch(self, app, kind=u'auto', interval=1.0):
+        """
+        Watch the context folder and template folders, and invalidate cached state when files change
+
+        :param app: the app whose template folders to watch
+        :param kind: 'inotify', 'poll', or 'auto' to use inotify where it is available
+        :param interval: the polling interval, in seconds
+        :return: the watcher
+        """
+        template_folders = []
+
+        for loader in [app.jinja_loader] + [bp.jinja_loader for bp in app.blueprints.values()]:
+            if loader is not None:
+                template_folders.extend(loader.searchpath)
+
+        def changed(paths):
+            self.invalidate(paths)
+
+            # without auto reload, Jinja won't notice changed templates by itself
+            if any(path.startswith(tuple(template_folders)) for path in paths):
+                if app.jinja_env.cache is not None:
+                    app.jinja_env.cache.clear()
+
+        if self.watcher is not None:
+            self.watcher.stop()
+
+        self.watcher = create_watcher(kind, [self.index.folder] + template_folders, changed, interval)
+        self.watcher.start()
+
+        self.cache.validate = False
+
+        return self.watcher
+
+    def invalidate(self, paths=None):
+        """
+        Drop cached state for files that have changed
+
+        :param paths: the absolute paths of the changed files, or None to drop everything
+        :return: None
+        """
+        self.index.build()
+
+        if paths is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(paths)
+
+        self._selected.clear()
+        self._catalogs.clear()
+        self._merged.clear()
+
+        if self.render_cache is not None:
+            self.render_cache.clear()
+
+        # packs are build artifacts, only reopened when everything is dropped
+        if paths is None:
+            self._reset_packs()
+
+    def warm(self, threads=None):
+        """
+        Load every context file within the context folder, for every locale, into the cache
+
+        Files are loaded in parallel on a thread pool. The cache should be large
+        enough to hold every file for every locale, otherwise early entries are evicted.
+
+        :param threads: the number of threads to use, defaults to the number of CPUs
+        :return: the number of contexts loaded, and the time it took in seconds
+        """
+        start = default_timer()
+
+        self.index.build()
+
+        jobs = self._contexts()
+
+        pool = ThreadPool(threads)
+
+        try:
+            pool.map(lambda job: self._load(*job), jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+        return len(jobs), default_timer() - start
+
+    def freeze(self, threads=None):
+        """
+        Load every context file into the cache, then make the cache read-only
+
+        Call this before forking, as with gunicorn --preload. Workers then share the
+        parsed context instead of each parsing and holding its own copy. Cached
+        context is never revalidated, so changes are picked up on restart.
+
+        :param threads: the number of threads to use, defaults to the number of CPUs
+        :return: the number of contexts loaded, and the time it took in seconds
+        """
+
+        # make room for everything
+        self.cache.maxsize = max(self.cache.maxsize, len(self._contexts()))
+
+        count, elapsed = self.warm(threads)
+
+        self.cache.freeze()
+
+        # merged views refer to the contexts as they were before freezing
+        self._merged.clear()
+
+        # keep the collector from touching, and so copying, the shared objects
+        if hasattr(gc, u'freeze'):
+            gc.collect()
+            gc.freeze()
+
+        return count, elapsed
+
+    def compile_templates(self, app):
+        """
+        Compile every template, for every locale, into the bytecode cache
+
+        Run at build time, so that workers load compiled templates instead of compiling them on first use.
+
+        :param app: the app whose templates to compile
+        :return: the number of templates compiled, and the time it took in seconds
+        """
+        jinja_env = app.jinja_env
+
+        if jinja_env.bytecode_cache is None:
+            raise RuntimeError(u'Compiling templates requires LOCALES_BYTECODE_CACHE')
+
+        start = default_timer()
+
+        names = jinja_env.list_templates()
+
+        for name in names:
+
+            # the loader compiles and stores templates missing from the bytecode cache,
+            # and isn't short-circuited by Jinja's in-memory cache
+            jinja_env.loader.load(jinja_env, name)
+
+        return len(names), default_timer() - start
+
+    def build_packs(self):
+        """
+        Pack the context folder into a single file per locale
+
+        Each locale's pack holds every path which can be loaded from the context
+        folder, as it resolves for that locale: localized files, fallbacks and
+        common files. Run at build time, then set LOCALES_PACKS.
+
+        :return: the number of entries written across every pack, and the time it took in seconds
+        """
+        start = default_timer()
+        count = 0
+
+        self.index.build()
+
+        contexts = self._contexts()
+
+        for locale in self._allowed:
+            entries = {}
+
+            for path, _locale in contexts:
+
+                if _locale != locale:
+                    continue
+
+                resolved = self.index.resolve(path, locale, self._attempts(path, locale))
+
+                # paths relative to the root aren't packed
+                if resolved is None or not resolved.startswith(self.index.folder):
+                    continue
+
+                context = self.context_loader(resolved)
+
+                # lazily decoded context is packed as a plain dict
+                if isinstance(context, Mapping) and not isinstance(context, dict):
+                    context = dict(context)
+
+                entries[path] = context
+
+            write_pack(self._pack_path(locale), entries)
+            count += len(entries)
+
+        self._reset_packs()
+
+        return count, default_timer() - start
+
+    def _pack(self, locale):
+        """
+        Return the pack for locale, opening it on first use
+
+        :param locale: the locale
+        :return: the pack, or None if packs are off or there is no pack for locale
+        """
+        if self.packs is None:
+            return None
+
+        try:
+            return self.packs[locale]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if locale not in self.packs:
+                try:
+                    self.packs[locale] = Pack(self._pack_path(locale))
+                # missing, or built by another version, so use the loose files
+                except (IOError, OSError, ValueError):
+                    self.packs[locale] = None
+
+            return self.packs[locale]
+
+    def _pack_path(self, locale):
+        return os.path.join(self.index.folder, u'.cc', u'{0}.pack'.format(locale))
+
+    def _reset_packs(self):
+        """
+        Drop open packs, so they are reopened on next use
+
+        Packs are unmapped once nothing is using them, rather than closed under
+        a thread which may be reading one.
+
+        :return: None
+        """
+        if self.packs is not None:
+            with self._lock:
+                self.packs.clear()
+
+    def _contexts(self):
+        """
+        Return every (path, locale) pair that can be loaded from the context folder
+
+        Only pairs which resolve to a file are returned, so a file which exists
+        for a single locale is only loaded for that locale.
+
+        :return: a list of (path, locale)
+        """
+
+        paths = set()
+
+        for filename in self.index:
+
+            # skip hidden files, and anything the loader can't handle
+            if os.path.basename(filename).startswith(u'.') or not filename.endswith(self.context_extensions):
+                continue
+
+            parts = filename.split(os.sep)
+
+            # strip the locale, to get the path as passed to load
+            if len(parts) > 1 and parts[-2] in self._known:
+                del parts[-2]
+
+            paths.add(u'/'.join(parts))
+
+        return [
+            (path, locale) for locale in self._allowed for path in sorted(paths)
+            if self.index.resolve(path, locale, self._attempts(path, locale)) is not None
+        ]
+
+    def metrics(self):
+        """
+        Serve the collected stats in the Prometheus text format
+
+        Registered at LOCALES_METRICS_URL.
+
+        :return: the response
+        """
+        return current_app.response_class(self.stats.prometheus(), mimetype=u'text/plain; version=0.0.4')
 
     ###
     # Template globals and filter interface
@@ -264,6 +1300,75 @@ class Locales(object):
         """
         return self.tag_map.get(locale)
 
+    def t(self, key):
+        """
+        execute the t global and filter
+
+        Looks up a string by its dotted key, which is the context file's path
+        followed by the keys within it, as in t('blueprint.page.header.title')
+        for header.title within blueprint/page.yaml. Keys missing from the
+        current locale fall back to the default locale.
+
+        :param key: the dotted key
+        :return: the string, or the key itself if it isn't found
+        """
+        try:
+            return self._catalog(self.current)[key]
+        except KeyError:
+            pass
+
+        return self._catalog(self.default).get(key, key)
+
+    def _catalog(self, locale):
+        """
+        Return the flattened context for locale, compiling it on first use
+
+        In debug, without a watcher, catalogs are compiled once per request so that changes are picked up.
+        Otherwise, while the cache checks files for changes, each catalog is checked once per request
+        against the files it was compiled from, as load_many does.
+
+        :param locale: the locale
+        :return: a dict of dotted key --> string
+        """
+        if self.watcher is None and current_app.debug:
+            catalogs = g.setdefault(u'_locales_catalogs', {})
+        else:
+            catalogs = self._catalogs
+
+        checked = g.setdefault(u'_locales_catalogs_checked', set())
+        entry = catalogs.get(locale)
+
+        if entry is not None:
+            paths, versions, catalog = entry
+
+            if locale in checked or not self.cache.validate or self._versions(paths, locale) == versions:
+                checked.add(locale)
+                return catalog
+
+        paths = tuple(path for path, _locale in self._contexts() if _locale == locale)
+        versions = self._versions(paths, locale)
+        catalog = {}
+
+        for path in paths:
+
+            prefix = path.rsplit(u'.', 1)[0].replace(u'/', u'.') + u'.'
+            context = self._load(path, locale)
+
+            # empty files, lists and scalars have no keys to look up
+            if not isinstance(context, Mapping):
+                continue
+
+            # promote the locale's section, and skip the others
+            if isinstance(context.get(locale), Mapping):
+                catalog.update(flatten(context[locale], prefix))
+
+            catalog.update((k, v) for k, v in flatten(context, prefix, self._known).items() if k not in catalog)
+
+        catalogs[locale] = (paths, versions, catalog)
+        checked.add(locale)
+
+        return catalog
+
     def get_next_tag(self):
         """
         Return the tag for the next locale
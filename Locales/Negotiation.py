@@ -0,0 +1,109 @@
+# -*- coding: UTF-8 -*- #
+
+import re
+from werkzeug.datastructures import LanguageAccept
+from werkzeug.http import parse_accept_header
+
+_separators = re.compile(u'[_-]')
+
+
+def parents(locale):
+    """
+    Return the more general locales of locale, most specific first
+
+    'zh_Hant_TW' --> ['zh_Hant', 'zh']
+
+    :param locale: the locale
+    :return: a list of locales
+    """
+    parts = _separators.split(locale)
+
+    return [u'_'.join(parts[:i]) for i in range(len(parts) - 1, 0, -1)]
+
+
+def fallback_chains(allowed, overrides=None):
+    """
+    Return the locales to try, in order, for each allowed locale
+
+    Each locale falls back to its more general locales, then to the default,
+    which is the first allowed locale. overrides replaces the middle of the
+    chain, as in {'zh_Hant': ['zh_Hans']}.
+
+    :param allowed: the allowed locales
+    :param overrides: locale --> the locales to try before the default
+    :return: a dict of locale --> tuple of locales
+    """
+    return dict((locale, fallback_chain(locale, allowed[0], overrides)) for locale in allowed)
+
+
+def fallback_chain(locale, default, overrides=None):
+    """
+    Return the locales to try, in order, for locale
+
+    :param locale: the locale
+    :param default: the default locale, tried last
+    :param overrides: locale --> the locales to try before the default
+    :return: a tuple of locales
+    """
+    if overrides and locale in overrides:
+        middle = list(overrides[locale])
+    else:
+        middle = parents(locale)
+
+    chain = []
+
+    for _locale in [locale] + middle + [default]:
+        if _locale not in chain:
+            chain.append(_locale)
+
+    return tuple(chain)
+
+
+class Negotiator(object):
+    """
+    Matches Accept-Language headers against the allowed locales.
+
+    Language tags are compared without regard to case or separator, and a
+    tag with no exact match falls back to its primary language, so that
+    'en-GB' matches 'en', and 'zh-TW' matches the first allowed Chinese
+    locale. The tags each locale answers to are computed once, up front.
+    """
+
+    def __init__(self, allowed):
+
+        # normalized tag --> locale
+        self.table = {}
+
+        for locale in allowed:
+            self.table.setdefault(_normalize(locale), locale)
+
+        # the allowed locale which answers for a more general tag
+        for locale in allowed:
+            for parent in parents(locale):
+                self.table.setdefault(_normalize(parent), locale)
+
+    def match(self, header):
+        """
+        Return the allowed locale that best matches an Accept-Language header
+
+        :param header: the Accept-Language header
+        :return: the locale, or None
+        """
+        for value, quality in parse_accept_header(header, LanguageAccept):
+
+            if quality <= 0:
+                continue
+
+            tag = _normalize(value)
+
+            for candidate in [tag] + parents(tag):
+                locale = self.table.get(candidate)
+
+                if locale is not None:
+                    return locale
+
+        return None
+
+
+def _normalize(tag):
+    return tag.lower().replace(u'-', u'_')
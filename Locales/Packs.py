@@ -0,0 +1,121 @@
+# -*- coding: UTF-8 -*- #
+
+import marshal
+import mmap
+from threading import RLock
+from Cache import signature
+from Loaders import COMPILED_HEADER, INDEX_SIZE, _MARSHAL, _header, _check_header, _serialize, _deserialize, _write_atomic
+
+PACK_MAGIC = b'LCP'
+
+
+def build_pack(entries):
+    """
+    Serialize every context for a locale into a single pack
+
+    The pack starts with an index of path --> offsets, followed by each
+    serialized context, so that any entry can be read without the others.
+
+    :param entries: a dict of path, as passed to load --> context
+    :return: the pack
+    """
+    index = {}
+    bodies = []
+    offset = 0
+
+    for path in sorted(entries):
+        serializer, body = _serialize(entries[path])
+
+        index[path] = (serializer, offset, offset + len(body))
+        bodies.append(body)
+
+        offset += len(body)
+
+    index = marshal.dumps(index)
+
+    return b''.join([_header(PACK_MAGIC, _MARSHAL), INDEX_SIZE.pack(len(index)), index] + bodies)
+
+
+def write_pack(path, entries):
+    """
+    Build a pack, and write it to path
+
+    :param path: the path to write
+    :param entries: a dict of path, as passed to load --> context
+    :return: None
+    """
+    _write_atomic(path, build_pack(entries))
+
+
+class Pack(object):
+    """
+    A memory-mapped pack of context, for one locale.
+
+    Only the index is read up front. Each entry is decoded on first use, and
+    kept, so serving a context takes no system calls at all.
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+
+        # identifies this version of the pack
+        self.signature = signature(path)
+
+        with open(path, u'rb') as infile:
+            try:
+                self._data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty file
+                raise ValueError(u'Not a context pack')
+
+        _check_header(self._data, PACK_MAGIC)
+
+        start = COMPILED_HEADER.size + INDEX_SIZE.size
+        size, = INDEX_SIZE.unpack_from(self._data, COMPILED_HEADER.size)
+
+        self._index = marshal.loads(self._data[start:start + size])
+        self._base = start + size
+
+        # path --> decoded context
+        self._decoded = {}
+        self._lock = RLock()
+
+    def lookup(self, path):
+        """
+        Return the context packed for path
+
+        :param path: the path, as passed to load
+        :return: the context, and True if it had already been decoded
+        :raises KeyError: if path isn't in the pack
+        """
+        try:
+            return self._decoded[path], True
+        except KeyError:
+            pass
+
+        serializer, start, end = self._index[path]
+
+        with self._lock:
+            context = self._decoded.setdefault(
+                path, _deserialize(serializer, self._data[self._base + start:self._base + end])
+            )
+
+        return context, False
+
+    def close(self):
+        """
+        Unmap the pack. Contexts already decoded remain usable.
+
+        :return: None
+        """
+        self._data.close()
+
+    def __contains__(self, path):
+        return path in self._index
+
+    def __iter__(self):
+        return iter(sorted(self._index))
+
+    def __len__(self):
+        return len(self._index)
@@ -0,0 +1,28 @@
+# -*- coding: UTF-8 -*- #
+
+from flask.signals import Namespace, signals_available
+
+_signals = Namespace()
+
+# sent by the Locales instance after context is loaded, with path, locale,
+# resolved (the file), tier ('pack', 'locale', 'fallback', 'context' or
+# 'root'), hit (whether it came from the cache) and elapsed (seconds)
+context_loaded = _signals.signal(u'locales-context-loaded')
+
+# sent after the template to render is chosen, with template (the name, or
+# the candidates when Jinja auto-reloads), locale and elapsed (seconds)
+template_selected = _signals.signal(u'locales-template-selected')
+
+# sent when the current locale is resolved for a request, with locale and
+# source ('session', 'url', 'header', 'accept_language' or 'default')
+locale_resolved = _signals.signal(u'locales-locale-resolved')
+
+
+def has_receivers(signal):
+    """
+    Check whether anything is connected to signal, so that sending can be skipped
+
+    :param signal: the signal
+    :return: True if signal has receivers
+    """
+    return signals_available and bool(signal.receivers)
@@ -0,0 +1,148 @@
+# -*- coding: UTF-8 -*- #
+
+from threading import RLock
+
+
+class MemoryStats(object):
+    """
+    Collects counters and timings in memory.
+
+    Any object with the same incr and timing methods can be used as a stats
+    sink instead, to forward to statsd or similar.
+    """
+
+    prefix = u'locales'
+
+    def __init__(self):
+
+        # (name, labels) --> count
+        self._counters = {}
+
+        # (name, labels) --> [count, total seconds, max seconds]
+        self._timings = {}
+
+        self._lock = RLock()
+
+    def incr(self, name, value=1, **labels):
+        """
+        Increment a counter
+
+        :param name: the counter
+        :param value: the amount to add
+        :param labels: labels, such as the source of a value
+        :return: None
+        """
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def timing(self, name, seconds, **labels):
+        """
+        Record the duration of an operation
+
+        :param name: the timing
+        :param seconds: the duration
+        :param labels: labels, such as the path that was loaded
+        :return: None
+        """
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            timing = self._timings.get(key)
+
+            if timing is None:
+                self._timings[key] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+
+    def counters(self):
+        """
+        Return the counters
+
+        :return: a dict of (name, labels) --> count
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def timings(self):
+        """
+        Return the timings
+
+        :return: a dict of (name, labels) --> (count, total seconds, max seconds)
+        """
+        with self._lock:
+            return dict((key, tuple(value)) for key, value in self._timings.items())
+
+    def reset(self):
+        """
+        Clear everything
+
+        :return: None
+        """
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def prometheus(self):
+        """
+        Return everything in the Prometheus text exposition format
+
+        Counters are exported as <prefix>_<name>_total, and timings as
+        <prefix>_<name>_seconds summaries, with a _max gauge alongside.
+
+        :return: the text
+        """
+        lines = []
+
+        for name, samples in _group(self.counters()):
+            metric = u'{0}_{1}_total'.format(self.prefix, name)
+
+            lines.append(u'# TYPE {0} counter'.format(metric))
+
+            for labels, count in samples:
+                lines.append(u'{0}{1} {2}'.format(metric, _labels(labels), count))
+
+        for name, samples in _group(self.timings()):
+            metric = u'{0}_{1}_seconds'.format(self.prefix, name)
+
+            lines.append(u'# TYPE {0} summary'.format(metric))
+
+            for labels, (count, total, _max) in samples:
+                lines.append(u'{0}_count{1} {2}'.format(metric, _labels(labels), count))
+                lines.append(u'{0}_sum{1} {2!r}'.format(metric, _labels(labels), total))
+
+            lines.append(u'# TYPE {0}_max gauge'.format(metric))
+
+            for labels, (count, total, _max) in samples:
+                lines.append(u'{0}_max{1} {2!r}'.format(metric, _labels(labels), _max))
+
+        return u'\n'.join(lines) + u'\n'
+
+
+def _group(values):
+    """
+    Group (name, labels) --> value by name
+
+    :param values: the dict to group
+    :return: a sorted list of (name, [(labels, value), ...])
+    """
+    groups = {}
+
+    for (name, labels), value in values.items():
+        groups.setdefault(name, []).append((labels, value))
+
+    return [(name, sorted(groups[name])) for name in sorted(groups)]
+
+
+def _labels(labels):
+    if not labels:
+        return u''
+
+    return u'{' + u','.join(u'{0}="{1}"'.format(k, _escape(v)) for k, v in labels) + u'}'
+
+
+def _escape(value):
+    return unicode(value).replace(u'\\', u'\\\\').replace(u'"', u'\\"').replace(u'\n', u'\\n')
@@ -0,0 +1,211 @@
+# -*- coding: UTF-8 -*- #
+
+import os
+from threading import Thread, Event
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+class Watcher(object):
+    """
+    Watches folders for changes in a background thread.
+
+    callback is called with a list of the paths that were added, modified or
+    removed. Hidden directories, such as the .cc caches, are ignored.
+    """
+
+    def __init__(self, folders, callback):
+
+        self.folders = [f for f in folders if os.path.isdir(f)]
+        self.callback = callback
+
+        self._stopped = Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start watching
+
+        :return: None
+        """
+        self._stopped.clear()
+
+        self._thread = Thread(target=self._run, name=u'locales-watcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watching, and wait for the thread to exit
+
+        :return: None
+        """
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.check()
+
+    def check(self):
+        """
+        Look for changes once, and call back if any were found
+
+        :return: the list of changed paths
+        """
+        raise NotImplementedError(u'You need to override check')
+
+
+class PollingWatcher(Watcher):
+    """
+    Watches folders by comparing the mtime and size of every file, every interval seconds.
+    """
+
+    def __init__(self, folders, callback, interval=1.0):
+        super(PollingWatcher, self).__init__(folders, callback)
+
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def check(self):
+        snapshot = self._scan()
+
+        changed = sorted(path for path in set(snapshot) | set(self._snapshot)
+                         if snapshot.get(path) != self._snapshot.get(path))
+
+        self._snapshot = snapshot
+
+        if changed:
+            self.callback(changed)
+
+        return changed
+
+    def _scan(self):
+        """
+        Return the (mtime, size) of every file within the folders
+
+        :return: a dict of path --> (mtime, size)
+        """
+        snapshot = {}
+
+        for folder in self.folders:
+            for dirpath, dirnames, filenames in os.walk(folder):
+
+                dirnames[:] = [d for d in dirnames if not d.startswith(u'.')]
+
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+
+                    snapshot[path] = (st.st_mtime, st.st_size)
+
+        return snapshot
+
+
+class InotifyWatcher(Watcher):
+    """
+    Watches folders using inotify, so that nothing is done until a file changes.
+
+    Requires the inotify_simple package, and Linux.
+    """
+
+    mask = 0
+
+    if INotify is not None:
+        mask = flags.CLOSE_WRITE | flags.CREATE | flags.DELETE | flags.MOVED_FROM | flags.MOVED_TO
+
+    def __init__(self, folders, callback, timeout=1.0):
+        super(InotifyWatcher, self).__init__(folders, callback)
+
+        # how long to block waiting for events, so that stop() is noticed
+        self.timeout = timeout
+
+        self._inotify = INotify()
+
+        # watch descriptor --> directory
+        self._dirs = {}
+
+        for folder in self.folders:
+            self._watch_tree(folder)
+
+    def _watch_tree(self, folder):
+        for dirpath, dirnames, filenames in os.walk(folder):
+
+            dirnames[:] = [d for d in dirnames if not d.startswith(u'.')]
+
+            wd = self._inotify.add_watch(dirpath, self.mask)
+            self._dirs[wd] = dirpath
+
+    def stop(self):
+        super(InotifyWatcher, self).stop()
+        self._inotify.close()
+
+    def check(self):
+        changed = set()
+
+        for event in self._inotify.read(timeout=int(self.timeout * 1000), read_delay=50):
+
+            dirpath = self._dirs.get(event.wd)
+
+            if dirpath is None or event.name.startswith(u'.'):
+                continue
+
+            path = os.path.join(dirpath, event.name)
+
+            # watch new directories too
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    self._watch_tree(path)
+
+            changed.add(path)
+
+        changed = sorted(changed)
+
+        if changed:
+            self.callback(changed)
+
+        return changed
+
+
+# the kinds of watcher create_watcher accepts
+WATCHERS = (u'inotify', u'poll', u'auto')
+
+
+def create_watcher(kind, folders, callback, interval=1.0):
+    """
+    Create a watcher
+
+    :param kind: 'inotify', 'poll', or 'auto' to use inotify where it is available
+    :param folders: the folders to watch
+    :param callback: called with the list of changed paths
+    :param interval: the polling interval, in seconds
+    :return: the watcher
+    """
+
+    if kind == u'auto':
+        kind = u'inotify' if INotify is not None else u'poll'
+
+    if kind == u'inotify':
+        if INotify is None:
+            raise RuntimeError(u'inotify watching requires the inotify_simple package')
+
+        return InotifyWatcher(folders, callback, interval)
+
+    if kind == u'poll':
+        return PollingWatcher(folders, callback, interval)
+
+    raise ValueError(u'Unknown watcher: {0}'.format(kind))
@@ -0,0 +1,307 @@
+# -*- coding: UTF-8 -*- #
+
+"""
+Benchmarks for Locales
+
+    python -m Locales.bench [--iterations 100] [--repeat 5] [--sizes 10,100,1000] [--locales 2,8] [--output results.json]
+
+Covers cold and warm context loads for every loader, loads from packs, path
+localization, render_template with and without a localized template, and
+Accept-Language resolution, across context file sizes and locale counts.
+Results can be saved as json, to catch regressions between releases.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from timeit import default_timer
+
+import yaml
+from flask import Flask, g
+
+from Locales import Locales
+from Loaders import yaml_loader, json_loader, json_caching_yaml_loader, compiled_caching_yaml_loader
+from Loaders import lazy_caching_yaml_loader
+from Loaders import YAML_BACKEND
+
+# name, loader, and the extension of the file it loads
+LOADERS = [
+    (u'yaml', yaml_loader, u'.yaml'),
+    (u'json', json_loader, u'.json'),
+    (u'jcyl', json_caching_yaml_loader, u'.yaml'),
+    (u'compiled', compiled_caching_yaml_loader, u'.yaml'),
+    (u'lazy', lazy_caching_yaml_loader, u'.yaml'),
+]
+
+LOCALE_CODES = [
+    u'en', u'de', u'fr', u'es', u'it', u'pt', u'nl', u'sv', u'da', u'fi', u'nb', u'pl', u'cs', u'sk', u'hu', u'ro',
+    u'bg', u'el', u'tr', u'ru', u'uk', u'he', u'ar', u'hi', u'th', u'vi', u'id', u'ms', u'ja', u'ko', u'zh_Hans', u'zh_Hant'
+]
+
+
+def run(iterations=100, repeat=5, sizes=(10, 100, 1000), locale_counts=(2, 8)):
+    """
+    Run every benchmark
+
+    :param iterations: calls per timing sample
+    :param repeat: timing samples per benchmark
+    :param sizes: the number of sections in the generated context files
+    :param locale_counts: the number of configured locales
+    :return: a list of results
+    """
+    results = []
+
+    for count in locale_counts:
+        root = tempfile.mkdtemp()
+
+        try:
+            app = _build(root, sizes, LOCALE_CODES[:count])
+            params = {u'locales': count}
+
+            # the loaders don't depend on the number of locales
+            if count == locale_counts[0]:
+                results.extend(_bench_loaders(app, sizes, iterations, repeat))
+
+            results.extend(_bench_requests(app, sizes, iterations, repeat, params))
+
+        finally:
+            shutil.rmtree(root)
+
+    return results
+
+
+def _build(root, sizes, locales):
+    """
+    Generate an app with a context folder and templates
+
+    :param root: the app's root path
+    :param sizes: the number of sections in each context file
+    :param locales: the locales to configure
+    :return: the app
+    """
+
+    for locale in [u''] + locales:
+        os.makedirs(os.path.join(root, u'context', locale))
+        os.makedirs(os.path.join(root, u'templates', locale))
+
+    for size in sizes:
+        context = dict(
+            (u'section_{0}'.format(i), {u'title': u'Title {0}'.format(i), u'body': u'Body text. ' * 10})
+            for i in range(size)
+        )
+
+        for locale in locales:
+            with open(os.path.join(root, u'context', locale, u'page_{0}.yaml'.format(size)), u'w') as outfile:
+                yaml.safe_dump(context, outfile)
+
+        # for json_loader, outside the context folder so that it isn't served
+        with open(os.path.join(root, u'page_{0}.json'.format(size)), u'w') as outfile:
+            json.dump(context, outfile)
+
+    # page.html is never localized, localized.html always is
+    for locale in [u''] + locales:
+        folder = os.path.join(root, u'templates', locale)
+
+        with open(os.path.join(folder, u'localized.html'), u'w') as outfile:
+            outfile.write(u'{{ section_0.title }} {{ current_locale() }}\n')
+
+    with open(os.path.join(root, u'templates', u'page.html'), u'w') as outfile:
+        outfile.write(u'{{ section_0.title }} {{ current_locale() }}\n')
+
+    app = Flask(u'bench', root_path=root, template_folder=u'templates')
+    app.config[u'SECRET_KEY'] = u'bench'
+    app.config[u'LOCALES'] = [(locale, locale.upper()) for locale in locales]
+
+    Locales(app)
+
+    return app
+
+
+def _bench_loaders(app, sizes, iterations, repeat):
+    results = []
+    locales = app.extensions[u'locales']
+
+    for size in sizes:
+        paths = {
+            u'.yaml': os.path.join(locales.index.folder, u'en', u'page_{0}.yaml'.format(size)),
+            u'.json': os.path.join(app.root_path, u'page_{0}.json'.format(size))
+        }
+        cache_folder = os.path.join(os.path.dirname(paths[u'.yaml']), u'.cc')
+
+        def clear():
+            shutil.rmtree(cache_folder, ignore_errors=True)
+
+        for name, loader, extension in LOADERS:
+            path = paths[extension]
+
+            # cold: nothing cached on disk
+            results.append(_result(u'load.cold', _time(lambda: loader(None, path), iterations, repeat, clear),
+                                   iterations, loader=name, size=size))
+
+            # warm: the .cc cache is current
+            loader(None, path)
+
+            results.append(_result(u'load.warm', _time(lambda: loader(None, path), iterations, repeat),
+                                   iterations, loader=name, size=size))
+
+        clear()
+
+        # served from the in-memory cache
+        with app.test_request_context():
+            app.preprocess_request()
+            g.locales.current = u'en'
+
+            results.append(_result(u'load.memory', _time(lambda: g.locales.load(u'page_{0}.yaml'.format(size)),
+                                                         iterations, repeat),
+                                   iterations, size=size))
+
+    # served from the locale's pack
+    locales.build_packs()
+    locales.packs = {}
+
+    with app.test_request_context():
+        app.preprocess_request()
+        g.locales.current = u'en'
+
+        for size in sizes:
+            results.append(_result(u'load.pack', _time(lambda: g.locales.load(u'page_{0}.yaml'.format(size)),
+                                                       iterations, repeat),
+                                   iterations, size=size))
+
+    locales.packs = None
+
+    return results
+
+
+def _bench_requests(app, sizes, iterations, repeat, params):
+    results = []
+    locales = app.extensions[u'locales']
+
+    header = u','.join(u'{0};q=0.{1}'.format(locale.replace(u'_', u'-'), 9 - i % 9)
+                       for i, locale in enumerate(reversed(locales._allowed)))
+
+    with app.test_request_context(headers={u'Accept-Language': header}):
+        app.preprocess_request()
+
+        def resolve():
+            g._locales_current = None
+            return g.locales.current
+
+        results.append(_result(u'accept_language.cached', _time(resolve, iterations, repeat), iterations, **params))
+        results.append(_result(u'accept_language.uncached',
+                               _time(resolve, iterations, repeat, g.locales._accept_cache.clear),
+                               iterations, **params))
+
+        g.locales.current = locales._allowed[-1]
+
+        results.append(_result(u'localify_path', _time(lambda: g.locales._localify_path(u'blueprint/page.html'),
+                                                       iterations, repeat),
+                               iterations, **params))
+
+        for size in sizes:
+            context = u'page_{0}.yaml'.format(size)
+
+            for name, template in ((u'render_template.localized', u'localized.html'),
+                                   (u'render_template.fallback', u'page.html')):
+
+                results.append(_result(name, _time(lambda: g.locales.render_template(template, context),
+                                                   iterations, repeat),
+                                       iterations, size=size, **params))
+
+    return results
+
+
+def _time(func, iterations, repeat, setup=None):
+    """
+    Time func
+
+    :param func: the function to time
+    :param iterations: calls per sample
+    :param repeat: the number of samples
+    :param setup: called, untimed, before each call
+    :return: the best and median time per call, in seconds
+    """
+    samples = []
+
+    for i in range(repeat):
+        elapsed = 0.
+
+        for j in range(iterations):
+            if setup is not None:
+                setup()
+
+            start = default_timer()
+            func()
+            elapsed += default_timer() - start
+
+        samples.append(elapsed / iterations)
+
+    samples.sort()
+
+    return samples[0], samples[len(samples) // 2]
+
+
+def _result(name, timing, iterations, **params):
+    best, median = timing
+
+    return {
+        u'name': name,
+        u'params': params,
+        u'iterations': iterations,
+        u'best': best,
+        u'median': median
+    }
+
+
+def report(results, stream=sys.stdout):
+    """
+    Print results as a table
+
+    :param results: the results of run
+    :param stream: where to print
+    :return: None
+    """
+    stream.write(u'{0:<28} {1:<36} {2:>12} {3:>12}\n'.format(u'benchmark', u'params', u'best (us)', u'median (us)'))
+
+    for result in results:
+        params = u' '.join(u'{0}={1}'.format(k, v) for k, v in sorted(result[u'params'].items()))
+
+        stream.write(u'{0:<28} {1:<36} {2:>12.1f} {3:>12.1f}\n'.format(
+            result[u'name'], params, result[u'best'] * 1e6, result[u'median'] * 1e6
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=u'Benchmark Locales')
+    parser.add_argument(u'--iterations', type=int, default=100, help=u'calls per timing sample')
+    parser.add_argument(u'--repeat', type=int, default=5, help=u'timing samples per benchmark')
+    parser.add_argument(u'--sizes', default=u'10,100,1000', help=u'sections per context file')
+    parser.add_argument(u'--locales', default=u'2,8', help=u'numbers of configured locales')
+    parser.add_argument(u'--output', help=u'save the results as json')
+
+    args = parser.parse_args(argv)
+
+    results = run(
+        iterations=args.iterations,
+        repeat=args.repeat,
+        sizes=[int(size) for size in args.sizes.split(u',')],
+        locale_counts=[int(count) for count in args.locales.split(u',')]
+    )
+
+    report(results)
+
+    if args.output:
+        with open(args.output, u'w') as outfile:
+            json.dump({
+                u'python': platform.python_version(),
+                u'yaml_backend': YAML_BACKEND,
+                u'results': results
+            }, outfile, indent=2, sort_keys=True)
+
+
+if __name__ == u'__main__':
+    main()
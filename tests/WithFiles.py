@@ -0,0 +1,61 @@
+# -*- coding: UTF-8 -*- #
+
+import codecs
+import os
+import shutil
+import tempfile
+
+
+class WithFiles(object):
+    """
+    Mixin to write a tree of files into a temporary root
+
+    This mixin must be applied before WithContext and unittest.TestCase:
+
+        class SomeTestCase(WithFiles, WithContext, unittest.TestCase):
+            files = {u'context/en/page.yaml': u'path: en/page.yaml'}
+            ...
+
+    Tests may:
+     - define files, a dict of path relative to the root --> content
+
+    A few instance properties are created:
+
+    self.root - the temporary root, written out before create_app() or setUp() runs
+
+    The root is removed after the test.
+    """
+
+    files = {}
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+        for path, content in self.files.items():
+            self.write(path, content)
+
+        super(WithFiles, self).setUp()
+
+    def tearDown(self):
+        try:
+            super(WithFiles, self).tearDown()
+        finally:
+            shutil.rmtree(self.root)
+
+    def write(self, path, content):
+        """
+        Write a file within the root, creating its folder
+
+        :param path: the path relative to the root
+        :param content: the content
+        :return: the absolute path
+        """
+        path = os.path.join(self.root, path)
+
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        with codecs.open(path, u'w', u'utf-8') as outfile:
+            outfile.write(content)
+
+        return path
@@ -175,3 +175,16 @@ class BasicTestCase(WithContext, unittest.TestCase):
 
         g.locales.current = u'zh_Hans'
         self.assertEqual(u'blueprint/zh_Hans/context.yaml', g.locales._localify_path(u'blueprint/context.yaml'))
+
+    def test_template_globals_are_installed_at_init(self):
+        """
+        template globals and filters are installed once, by init_app, and not per request
+        """
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+
+        locales = Locales(app)
+
+        self.assertEqual(app.jinja_env.globals[u'current_locale'], locales.get_current)
+        self.assertEqual(app.jinja_env.globals[u'next_locale_tag'], locales.get_next_tag)
+        self.assertEqual(app.jinja_env.filters[u'tag'], locales.tag)
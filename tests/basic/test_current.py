@@ -0,0 +1,145 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+from flask import Flask, g, session, url_for
+from Locales.Locales import Locales
+from tests.config import CONFIG
+
+
+class CurrentLocaleTestCase(unittest.TestCase):
+    """
+    The current locale is resolved per request, not per Locales instance
+    """
+
+    def setUp(self):
+        self.app = Flask(__name__, template_folder=u'templates')
+        self.app.config.from_object(CONFIG)
+
+        self.locales = Locales(self.app)
+
+    def current(self, **kwargs):
+        with self.app.test_request_context(**kwargs):
+            self.app.preprocess_request()
+            return g.locales.current
+
+    def test_each_request_resolves_its_own_locale(self):
+        self.assertEqual(self.current(headers={u'Accept-Language': u'zh-Hans'}), u'zh_Hans')
+        self.assertEqual(self.current(headers={u'Accept-Language': u'en-US,en;q=0.8'}), u'en')
+        self.assertEqual(self.current(), u'en')
+
+    def test_locale_is_memoized_on_g(self):
+        with self.app.test_request_context(headers={u'Accept-Language': u'zh-Hans'}):
+            self.app.preprocess_request()
+
+            self.assertEqual(g.locales.current, u'zh_Hans')
+            self.assertEqual(g._locales_current, u'zh_Hans')
+
+    def test_accept_language_matches_are_cached(self):
+        self.current(headers={u'Accept-Language': u'zh-Hans'})
+        self.current(headers={u'Accept-Language': u'fr'})
+
+        self.assertEqual(self.locales._accept_cache.get(u'zh-Hans'), u'zh_Hans')
+        self.assertIn(u'fr', self.locales._accept_cache)
+        self.assertIsNone(self.locales._accept_cache.get(u'fr'))
+
+    def test_derived_locale_is_not_written_to_the_session(self):
+        with self.app.test_request_context(headers={u'Accept-Language': u'zh-Hans'}):
+            self.app.preprocess_request()
+
+            self.assertEqual(g.locales.current, u'zh_Hans')
+            self.assertNotIn(u'locale', session)
+            self.assertFalse(session.modified)
+
+    def test_unchanged_locale_is_not_written_to_the_session(self):
+        with self.app.test_request_context():
+            self.app.preprocess_request()
+
+            session[u'locale'] = u'zh_Hans'
+            session.modified = False
+
+            g.locales.current = u'zh_Hans'
+            self.assertFalse(session.modified)
+
+            g.locales.current = u'en'
+            self.assertTrue(session.modified)
+            self.assertEqual(session[u'locale'], u'en')
+
+    def test_session_cookie_is_only_sent_on_change(self):
+
+        @self.app.route(u'/')
+        def index():
+            return g.locales.current
+
+        @self.app.route(u'/set/<locale>')
+        def set_locale(locale):
+            g.locales.current = locale
+            return locale
+
+        client = self.app.test_client()
+
+        self.assertNotIn(u'Set-Cookie', client.get(u'/').headers)
+        self.assertIn(u'Set-Cookie', client.get(u'/set/zh_Hans').headers)
+        self.assertNotIn(u'Set-Cookie', client.get(u'/set/zh_Hans').headers)
+        self.assertEqual(client.get(u'/').data, b'zh_Hans')
+
+
+class StatelessTestCase(unittest.TestCase):
+    """
+    In stateless mode, the locale comes from the request alone
+    """
+
+    def setUp(self):
+        self.app = Flask(__name__, template_folder=u'templates')
+        self.app.config.from_object(CONFIG)
+        self.app.config[u'LOCALES_STATELESS'] = True
+        self.app.config[u'LOCALES_HEADER'] = u'X-Locale'
+
+        @self.app.route(u'/')
+        @self.app.route(u'/<locale>/page')
+        def page(locale=None):
+            return u' '.join([g.locales.current, url_for(u'page')])
+
+        Locales(self.app)
+
+        self.client = self.app.test_client()
+
+    def test_locale_from_view_arg(self):
+        rv = self.client.get(u'/zh_Hans/page', headers={u'Accept-Language': u'en'})
+
+        self.assertEqual(rv.data, b'zh_Hans /zh_Hans/page')
+        self.assertNotIn(u'Set-Cookie', rv.headers)
+        self.assertNotIn(u'Vary', rv.headers)
+
+    def test_locale_from_query_arg(self):
+        rv = self.client.get(u'/?locale=zh_Hans')
+
+        self.assertEqual(rv.data.split()[0], b'zh_Hans')
+
+    def test_locale_from_header(self):
+        rv = self.client.get(u'/', headers={u'X-Locale': u'zh_Hans', u'Accept-Language': u'en'})
+
+        self.assertEqual(rv.data, b'zh_Hans /zh_Hans/page')
+        self.assertIn(u'X-Locale', rv.headers[u'Vary'])
+
+    def test_unknown_locales_are_ignored(self):
+        rv = self.client.get(u'/fr/page', headers={u'X-Locale': u'de', u'Accept-Language': u'zh-Hans'})
+
+        self.assertEqual(rv.data.split()[0], b'zh_Hans')
+        self.assertIn(u'Accept-Language', rv.headers[u'Vary'])
+
+    def test_session_is_not_used(self):
+
+        with self.app.test_request_context():
+            self.app.preprocess_request()
+
+            g.locales.current = u'zh_Hans'
+
+            self.assertEqual(g.locales.current, u'zh_Hans')
+            self.assertNotIn(u'locale', session)
+
+    def test_url_for_outside_a_request(self):
+        self.app.config[u'SERVER_NAME'] = u'example.com'
+
+        with self.app.app_context():
+            self.assertEqual(url_for(u'page'), u'http://example.com/')
+            self.assertEqual(url_for(u'page', locale=u'en'), u'http://example.com/en/page')
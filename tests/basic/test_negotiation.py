@@ -0,0 +1,80 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+from flask import Flask, g
+from Locales.Locales import Locales
+from Locales.Negotiation import Negotiator, parents, fallback_chains
+from tests.config import CONFIG
+
+
+class NegotiationTestCase(unittest.TestCase):
+
+    def test_parents(self):
+        self.assertEqual(parents(u'zh_Hant_TW'), [u'zh_Hant', u'zh'])
+        self.assertEqual(parents(u'en-GB'), [u'en'])
+        self.assertEqual(parents(u'en'), [])
+
+    def test_fallback_chains(self):
+        chains = fallback_chains([u'en', u'zh_Hans', u'zh_Hant', u'pt_BR'])
+
+        self.assertEqual(chains[u'en'], (u'en',))
+        self.assertEqual(chains[u'zh_Hant'], (u'zh_Hant', u'zh', u'en'))
+        self.assertEqual(chains[u'pt_BR'], (u'pt_BR', u'pt', u'en'))
+
+    def test_fallback_overrides(self):
+        chains = fallback_chains([u'en', u'zh_Hans', u'zh_Hant'], {u'zh_Hant': [u'zh_Hans', u'zh']})
+
+        self.assertEqual(chains[u'zh_Hant'], (u'zh_Hant', u'zh_Hans', u'zh', u'en'))
+        self.assertEqual(chains[u'zh_Hans'], (u'zh_Hans', u'zh', u'en'))
+
+    def test_exact_matches(self):
+        negotiator = Negotiator([u'en', u'zh_Hans', u'zh_Hant'])
+
+        self.assertEqual(negotiator.match(u'zh-hant, en;q=0.5'), u'zh_Hant')
+        self.assertEqual(negotiator.match(u'fr, ZH_HANS;q=0.8'), u'zh_Hans')
+
+    def test_primary_language_matches(self):
+        negotiator = Negotiator([u'fr', u'en_US', u'zh_Hans', u'zh_Hant'])
+
+        self.assertEqual(negotiator.match(u'en-GB'), u'en_US')
+        self.assertEqual(negotiator.match(u'zh-TW'), u'zh_Hans')
+        self.assertEqual(negotiator.match(u'zh-Hant-TW'), u'zh_Hant')
+
+        # tags are tried in order of preference
+        self.assertEqual(negotiator.match(u'de, en-GB;q=0.8, fr;q=0.5'), u'en_US')
+
+    def test_no_match(self):
+        negotiator = Negotiator([u'en', u'zh_Hans'])
+
+        self.assertIsNone(negotiator.match(u'de, fr'))
+        self.assertIsNone(negotiator.match(u'en;q=0'))
+
+
+class LocalesNegotiationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__, template_folder=u'templates')
+        self.app.config.from_object(CONFIG)
+        self.app.config[u'LOCALES'] = [(u'en', u'EN'), (u'zh_Hans', u'简体'), (u'zh_Hant', u'繁體')]
+
+        self.locales = Locales(self.app)
+
+    def current(self, **kwargs):
+        with self.app.test_request_context(**kwargs):
+            self.app.preprocess_request()
+            return g.locales.current
+
+    def test_chains_are_precomputed(self):
+        self.assertEqual(self.locales.chains[u'zh_Hant'], (u'zh_Hant', u'zh', u'en'))
+
+    def test_accept_language_matches_primary_language(self):
+        self.assertEqual(self.current(headers={u'Accept-Language': u'zh-HK'}), u'zh_Hans')
+        self.assertEqual(self.current(headers={u'Accept-Language': u'en-GB'}), u'en')
+        self.assertEqual(self.current(headers={u'Accept-Language': u'zh-Hant-HK'}), u'zh_Hant')
+
+    def test_localify_path_is_exact(self):
+        with self.app.test_request_context():
+            self.app.preprocess_request()
+            g.locales.current = u'zh_Hant'
+
+            self.assertEqual(g.locales._localify_path(u'blueprint/template.html'), u'blueprint/zh_Hant/template.html')
@@ -0,0 +1,158 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import os
+from Locales.Locales import Locales
+from Locales.Contexts import flatten
+from flask import Flask, session, g, Blueprint
+from tests.WithContext import WithContext
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+# blueprints using a common templates folder
+blueprint = Blueprint(u'blueprint', __name__)
+
+
+class CatalogTestCase(WithContext, unittest.TestCase):
+
+    def create_app(self):
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        # reset session before each test
+        session[u'locale'] = None
+
+    def test_flatten(self):
+        context = {u'page': {u'header': {u'title': u'Title'}, u'items': [1, 2]}, u'en': {}}
+
+        self.assertEqual(
+            flatten(context, u'file.', exclude=[u'en']),
+            {u'file.page.header.title': u'Title', u'file.page.items': [1, 2]}
+        )
+
+    def test_keys_are_prefixed_with_the_context_path(self):
+        g.locales.current = u'en'
+
+        self.assertEqual(g.locales.t(u'localed_context.path'), u'en/localed_context.yaml')
+        self.assertEqual(g.locales.t(u'blueprint.localed_context.path'), u'blueprint/en/localed_context.yaml')
+        self.assertEqual(g.locales.t(u'blueprint.common_context.path'), u'blueprint/common_context.yaml')
+
+    def test_locale_sections_are_promoted(self):
+        g.locales.current = u'zh_Hans'
+
+        self.assertEqual(g.locales.t(u'common_context.key'), u'中文')
+        self.assertNotIn(u'common_context.en.key', g.locales._catalog(u'zh_Hans'))
+
+    def test_missing_keys_return_the_key(self):
+        self.assertEqual(g.locales.t(u'_missing_.key'), u'_missing_.key')
+
+    def test_template_global_and_filter(self):
+        g.locales.current = u'en'
+
+        self.assertEqual(
+            g.locales.render_template(u'catalog.html').split(),
+            [u'english', u'en/context.yaml']
+        )
+
+    def test_catalogs_are_dropped_on_invalidate(self):
+        g.locales.t(u'context.path')
+        self.assertIn(u'en', g.locales._catalogs)
+
+        g.locales.invalidate()
+
+        self.assertEqual(g.locales._catalogs, {})
+
+
+class CatalogFallbackTestCase(WithFiles, unittest.TestCase):
+
+    files = {
+        u'context/en/page.yaml': u'title: Title\nsubtitle: Subtitle\n',
+        u'context/zh_Hans/page.yaml': u'title: 标题\n',
+    }
+
+    def setUp(self):
+        super(CatalogFallbackTestCase, self).setUp()
+
+        self.app = Flask(__name__, root_path=self.root)
+        self.app.config.from_object(CONFIG)
+
+        Locales(self.app)
+
+    def test_missing_keys_fall_back_to_the_default_locale(self):
+        with self.app.test_request_context():
+            self.app.preprocess_request()
+            g.locales.current = u'zh_Hans'
+
+            self.assertEqual(g.locales.t(u'page.title'), u'标题')
+            self.assertEqual(g.locales.t(u'page.subtitle'), u'Subtitle')
+
+
+class CatalogFilesTestCase(WithFiles, unittest.TestCase):
+    """
+    Catalogs are built from the files that resolve, and skip contexts without keys
+    """
+
+    files = {
+        u'context/page.yaml': u'title: Title\n',
+        u'context/zh_Hans/only.yaml': u'title: 标题\n',
+        u'context/empty.yaml': u'',
+        u'context/list.yaml': u'- one\n- two\n',
+        u'context/.gitkeep': u'',
+    }
+
+    def setUp(self):
+        super(CatalogFilesTestCase, self).setUp()
+
+        self.app = Flask(__name__, root_path=self.root)
+        self.app.config.from_object(CONFIG)
+
+        Locales(self.app)
+
+    def test_locale_only_file(self):
+        with self.app.test_request_context():
+            self.app.preprocess_request()
+
+            g.locales.current = u'zh_Hans'
+            self.assertEqual(g.locales.t(u'only.title'), u'标题')
+            self.assertEqual(g.locales.t(u'page.title'), u'Title')
+
+            g._locales_current = None
+            g.locales.current = u'en'
+            self.assertEqual(g.locales.t(u'only.title'), u'only.title')
+            self.assertEqual(g.locales.t(u'page.title'), u'Title')
+
+    def test_contexts_without_keys_are_skipped(self):
+        with self.app.test_request_context():
+            self.app.preprocess_request()
+            g.locales.current = u'en'
+
+            self.assertEqual(g.locales.t(u'empty'), u'empty')
+            self.assertEqual(g.locales.t(u'list'), u'list')
+            self.assertEqual(g.locales._catalog(u'en'), {u'page.title': u'Title'})
+
+    def test_modified_files_are_picked_up(self):
+        with self.app.test_request_context():
+            self.app.preprocess_request()
+            g.locales.current = u'en'
+
+            self.assertEqual(g.locales.t(u'page.title'), u'Title')
+
+        path = self.write(u'context/page.yaml', u'title: Changed\n')
+
+        # make sure the signature changes
+        os.utime(path, (0, 0))
+
+        with self.app.test_request_context():
+            self.app.preprocess_request()
+            g.locales.current = u'en'
+
+            self.assertEqual(g.locales.load(u'page.yaml')[u'title'], u'Changed')
+            self.assertEqual(g.locales.t(u'page.title'), u'Changed')
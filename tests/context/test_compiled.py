@@ -0,0 +1,156 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import datetime
+import os
+import shutil
+import tempfile
+from click.testing import CliRunner
+from flask import Flask
+from flask.cli import ScriptInfo
+from Locales.Locales import Locales
+from Locales.Commands import cli
+from Locales.Contexts import LazyContext
+from Locales.Loaders import compile_context, decompile_context, compiled_caching_yaml_loader, COMPILED_HEADER
+from Locales.Loaders import compile_indexed_context, lazy_loader, lazy_caching_yaml_loader
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+
+class CompiledContextTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, u'context.yaml')
+
+        with open(self.path, u'w') as outfile:
+            outfile.write(u'path: context.yaml\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_compiled_context_round_trips(self):
+        context = {u'greeting': u'你好', u'list': [1, 2.5, None, True]}
+
+        self.assertEqual(decompile_context(compile_context(context)), context)
+
+    def test_types_marshal_cant_handle_are_pickled(self):
+        context = {u'date': datetime.date(2015, 1, 1)}
+
+        self.assertEqual(decompile_context(compile_context(context)), context)
+
+    def test_compiled_context_from_another_version_is_rejected(self):
+        data = compile_context({})
+        data = data[:3] + b'\x00' + data[4:]
+
+        with self.assertRaises(ValueError):
+            decompile_context(data)
+
+        with self.assertRaises(ValueError):
+            decompile_context(b'')
+
+    def test_loader_writes_and_reads_the_compiled_file(self):
+        compiled_path = os.path.join(self.folder, u'.cc', u'context.lcc')
+
+        self.assertEqual(compiled_caching_yaml_loader(None, self.path), {u'path': u'context.yaml'})
+        self.assertTrue(os.path.exists(compiled_path))
+
+        self.assertEqual(compiled_caching_yaml_loader(None, self.path), {u'path': u'context.yaml'})
+
+    def test_loader_recompiles_files_from_another_version(self):
+        compiled_path = os.path.join(self.folder, u'.cc', u'context.lcc')
+        compiled_caching_yaml_loader(None, self.path)
+
+        with open(compiled_path, u'wb') as outfile:
+            outfile.write(b'LCC\x00')
+
+        self.assertEqual(compiled_caching_yaml_loader(None, self.path), {u'path': u'context.yaml'})
+
+        with open(compiled_path, u'rb') as infile:
+            self.assertGreater(len(infile.read()), COMPILED_HEADER.size)
+
+
+class CompileCommandTestCase(WithFiles, unittest.TestCase):
+
+    files = {
+        u'context/context.yaml': u'path: context\n',
+        u'context/en/context.yaml': u'path: context/en\n',
+    }
+
+    def setUp(self):
+        super(CompileCommandTestCase, self).setUp()
+
+        self.app = Flask(__name__, root_path=self.root)
+        self.app.config.from_object(CONFIG)
+
+        Locales(self.app)
+
+    def test_compile_command_compiles_the_context_folder(self):
+        result = CliRunner().invoke(cli, [u'compile'], obj=ScriptInfo(create_app=lambda info: self.app))
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn(u'Compiled 2 context files', result.output)
+
+        self.assertTrue(os.path.exists(os.path.join(self.root, u'context', u'.cc', u'context.lcc')))
+        self.assertTrue(os.path.exists(os.path.join(self.root, u'context', u'en', u'.cc', u'context.lcc')))
+
+
+class LazyContextTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, u'context.yaml')
+
+        with open(self.path, u'w') as outfile:
+            outfile.write(u'header:\n  title: Title\nbody:\n  - one\n  - two\ndate: 2015-01-01\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_sections_are_decoded_on_access(self):
+        lazy_caching_yaml_loader(None, self.path)
+        context = lazy_caching_yaml_loader(None, self.path)
+
+        self.assertIsInstance(context, LazyContext)
+        self.assertEqual(sorted(context), [u'body', u'date', u'header'])
+        self.assertIn(u'body', context)
+        self.assertEqual(context._decoded, {})
+
+        self.assertEqual(context[u'header'], {u'title': u'Title'})
+        self.assertEqual(list(context._decoded), [u'header'])
+
+    def test_lazy_context_equals_the_parsed_context(self):
+        parsed = lazy_caching_yaml_loader(None, self.path)
+
+        self.assertEqual(dict(lazy_caching_yaml_loader(None, self.path)), parsed)
+        self.assertEqual(parsed[u'date'], datetime.date(2015, 1, 1))
+
+    def test_missing_sections_raise_key_error(self):
+        context = lazy_loader(None, self.compile({u'a': 1}))
+
+        with self.assertRaises(KeyError):
+            context[u'b']
+
+        self.assertIsNone(context.get(u'b'))
+
+    def test_only_mappings_can_be_indexed(self):
+        with self.assertRaises(ValueError):
+            compile_indexed_context([1, 2])
+
+    def test_compiled_context_is_not_indexed(self):
+        path = os.path.join(self.folder, u'context.lcc')
+
+        with open(path, u'wb') as outfile:
+            outfile.write(compile_context({u'a': 1}))
+
+        with self.assertRaises(ValueError):
+            lazy_loader(None, path)
+
+    def compile(self, context):
+        path = os.path.join(self.folder, u'context.lci')
+
+        with open(path, u'wb') as outfile:
+            outfile.write(compile_indexed_context(context))
+
+        return path
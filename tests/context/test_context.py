@@ -4,7 +4,10 @@ import unittest
 
 import os
 from Locales.Locales import Locales
-from flask import Flask, session, g, Blueprint
+from Locales.Contexts import LazyContext
+from flask import Flask, session, g, Blueprint, template_rendered, before_render_template
+from flask.signals import signals_available
+from jinja2.exceptions import UndefinedError
 from tests.WithContext import WithContext
 from tests.config import CONFIG
 
@@ -116,3 +119,77 @@ class ContextTestCase(WithContext, unittest.TestCase):
 
         self.assertEqual(result[0], u'zh_Hans/template.html')
         self.assertEqual(result[1], u'extra')
+
+    def test_render_does_not_modify_cached_context(self):
+        """
+        Rendering should read the loaded context in place, without copying or modifying it
+        """
+        g.locales.current = u'en'
+        loaded = g.locales.load(u'context.yaml')
+        before = dict(loaded)
+
+        g.locales.render_template(u'template.html', u'context.yaml', other=u'extra')
+
+        self.assertEqual(loaded, before)
+
+    def test_render_errors_are_raised(self):
+        """
+        Template errors should surface as themselves, not as a failure to report them
+        """
+        g.locales.current = u'en'
+
+        with self.assertRaises(UndefinedError):
+            g.locales.render_template(u'other_locale.html')
+
+    @unittest.skipUnless(signals_available, u'blinker is not installed')
+    def test_render_applies_context_processors_and_sends_signals(self):
+        """
+        Rendering should behave like flask.render_template
+        """
+        rendered = []
+
+        def record(sender, template, context, **extra):
+            rendered.append((template.name, context[u'other'], context[u'processed'], u'request' in context))
+
+        self.app.context_processor(lambda: {u'processed': True, u'other': u'processor'})
+
+        with template_rendered.connected_to(record, self.app):
+            g.locales.current = u'en'
+            g.locales.render_template(u'template.html', other=u'extra')
+
+        self.assertEqual(rendered, [(u'en/template.html', u'extra', True, True)])
+
+    @unittest.skipUnless(signals_available, u'blinker is not installed')
+    def test_before_render_receivers_can_add_variables(self):
+        """
+        As with flask.render_template, receivers can add to the context, without modifying the loaded context
+        """
+
+        def add(sender, template, context, **extra):
+            context[u'other'] = u'added'
+
+        g.locales.current = u'en'
+        loaded = g.locales.load(u'context.yaml')
+        before = dict(loaded)
+
+        with before_render_template.connected_to(add, self.app):
+            result = g.locales.render_template(u'template.html', u'context.yaml').split()
+
+        self.assertEqual(result[2], u'added')
+        self.assertEqual(loaded, before)
+
+    def test_render_decodes_only_the_sections_used(self):
+        """
+        Lazy context should stay lazy through render_template
+        """
+        sections = {u'path': u'lazy', u'unused': u'never decoded'}
+
+        # each section decodes to sections[key]
+        index = dict((k, (k, 0, 0)) for k in sections)
+        context = LazyContext(b'', index, 0, lambda serializer, data: sections[serializer])
+
+        g.locales.current = u'en'
+        result = g.locales._render(g.locales._select_template(u'template.html'), g.locales._localify_context(context)).split()
+
+        self.assertEqual(result, [u'en/template.html', u'lazy'])
+        self.assertEqual(list(context._decoded), [u'path'])
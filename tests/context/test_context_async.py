@@ -0,0 +1,112 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import os
+import threading
+from Locales.Locales import Locales
+from flask import Flask, session, g, Blueprint
+from tests.WithContext import WithContext
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+# blueprints using a common templates folder
+blueprint = Blueprint(u'blueprint', __name__)
+
+
+class ContextLoadAsyncTestCase(WithContext, unittest.TestCase):
+
+    def create_app(self):
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        # reset session before each test
+        session[u'locale'] = None
+
+    def test_load_async(self):
+        g.locales.current = u'zh_Hans'
+
+        result = g.locales.load_async(u'blueprint/localed_context.yaml')
+
+        self.assertEqual(result.get(5).get(u'path'), u'blueprint/zh_Hans/localed_context.yaml')
+
+    def test_load_async_shares_the_cache(self):
+        g.locales.current = u'en'
+
+        context = g.locales.load_async(u'localed_context.yaml').get(5)
+
+        self.assertIs(g.locales.load(u'localed_context.yaml'), context)
+
+    def test_concurrent_loads_are_shared(self):
+        g.locales.current = u'en'
+
+        # hold the loader until both calls have been made
+        release = threading.Event()
+        loader = g.locales.context_loader
+
+        def slow_loader(path):
+            release.wait(5)
+            return loader(path)
+
+        g.locales.context_loader = slow_loader
+
+        first = g.locales.load_async(u'localed_context.yaml')
+        second = g.locales.load_async(u'localed_context.yaml')
+
+        release.set()
+
+        self.assertIs(first, second)
+        self.assertEqual(first.get(5).get(u'path'), u'en/localed_context.yaml')
+        self.assertEqual(g.locales._pending, {})
+
+
+class PreemptedPool(object):
+    """
+    Gives each task a chance to finish before apply_async returns, as if the caller was preempted
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def apply_async(self, func):
+        result = self.pool.apply_async(func)
+        result.wait(0.2)
+
+        return result
+
+
+class LoadAsyncChangesTestCase(WithFiles, WithContext, unittest.TestCase):
+
+    files = {
+        u'context/context.yaml': u'v: 1',
+    }
+
+    def create_app(self):
+        app = Flask(__name__, root_path=self.root)
+        app.config.from_object(CONFIG)
+
+        Locales(app)
+
+        return app
+
+    def test_finished_loads_are_not_reused(self):
+        g.locales.current = u'en'
+        g.locales._pool = PreemptedPool(g.locales._get_pool())
+
+        for value in (1, 22, 333):
+            path = self.write(u'context/context.yaml', u'v: {0}'.format(value))
+
+            # make sure the signature changes
+            os.utime(path, (value, value))
+
+            self.assertEqual(g.locales.load_async(u'context.yaml').get(5), {u'v': value})
+            self.assertEqual(g.locales.load_async(u'context.yaml').get(5), {u'v': value})
+
+        self.assertEqual(g.locales._pending, {})
@@ -0,0 +1,213 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import codecs
+import os
+import shutil
+import tempfile
+import threading
+import time
+from Locales.Locales import Locales
+from Locales.Cache import ContextCache, SingleFlight
+from Locales.Loaders import yaml_loader
+from flask import Flask, session, g, Blueprint
+from tests.WithContext import WithContext
+from tests.config import CONFIG
+
+# blueprints using a common templates folder
+blueprint = Blueprint(u'blueprint', __name__)
+
+
+class ContextCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, u'context.yaml')
+        self.write(u'path: first')
+
+        self.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, content):
+        with codecs.open(self.path, u'w', u'utf-8') as outfile:
+            outfile.write(content)
+
+    def loader(self, path):
+        self.calls += 1
+        return yaml_loader(None, path)
+
+    def test_repeat_loads_hit_the_cache(self):
+        cache = ContextCache()
+
+        cache.load(self.path, u'en', self.loader)
+        context = cache.load(self.path, u'en', self.loader)
+
+        self.assertEqual(context.get(u'path'), u'first')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_entries_are_keyed_on_locale(self):
+        cache = ContextCache()
+
+        cache.load(self.path, u'en', self.loader)
+        cache.load(self.path, u'zh_Hans', self.loader)
+
+        self.assertEqual(self.calls, 2)
+
+    def test_modified_file_is_reloaded(self):
+        cache = ContextCache()
+
+        cache.load(self.path, u'en', self.loader)
+
+        # change the size, and push the mtime forward
+        self.write(u'path: second, modified')
+        os.utime(self.path, (0, os.path.getmtime(self.path) + 10))
+
+        context = cache.load(self.path, u'en', self.loader)
+
+        self.assertEqual(context.get(u'path'), u'second, modified')
+        self.assertEqual(self.calls, 2)
+
+    def test_ttl_skips_revalidation(self):
+        cache = ContextCache(ttl=60)
+
+        cache.load(self.path, u'en', self.loader)
+
+        self.write(u'path: second, modified')
+        os.utime(self.path, (0, os.path.getmtime(self.path) + 10))
+
+        context = cache.load(self.path, u'en', self.loader)
+
+        self.assertEqual(context.get(u'path'), u'first')
+        self.assertEqual(self.calls, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ContextCache(maxsize=2)
+
+        cache.load(self.path, u'en', self.loader)
+        cache.load(self.path, u'zh_Hans', self.loader)
+        cache.load(self.path, u'en', self.loader)
+        cache.load(self.path, u'fr', self.loader)
+
+        self.assertIn((self.path, u'en'), cache)
+        self.assertNotIn((self.path, u'zh_Hans'), cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_zero_maxsize_disables_the_cache(self):
+        cache = ContextCache(maxsize=0)
+
+        cache.load(self.path, u'en', self.loader)
+        cache.load(self.path, u'en', self.loader)
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(len(cache), 0)
+
+
+class LocalesCacheTestCase(WithContext, unittest.TestCase):
+
+    def create_app(self):
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        # reset session before each test
+        session[u'locale'] = None
+
+    def test_load_uses_the_cache(self):
+        g.locales.current = u'en'
+
+        first = g.locales.load(u'localed_context.yaml')
+        second = g.locales.load(u'localed_context.yaml')
+
+        self.assertIs(first, second)
+        self.assertEqual(g.locales.cache.info()[u'hits'], 1)
+
+    def test_cache_is_configurable(self):
+        self.app.config[u'LOCALES_CACHE_SIZE'] = 0
+        self.app.config[u'LOCALES_CACHE_TTL'] = 30
+
+        locales = Locales(self.app)
+
+        self.assertEqual(locales.cache.maxsize, 0)
+        self.assertEqual(locales.cache.ttl, 30)
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def slow(self, value):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+
+        if isinstance(value, Exception):
+            raise value
+
+        return value
+
+    def run_concurrently(self, value, count=5):
+        results = []
+
+        def call():
+            try:
+                results.append(self.flight.do(u'key', self.slow, value))
+            except Exception as e:
+                results.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        self.started.wait(5)
+
+        followers = [threading.Thread(target=call) for i in range(count - 1)]
+
+        for thread in followers:
+            thread.start()
+
+        # wait until every follower is waiting on the leader
+        while self.flight.coalesced.get(u'key', 0) < count - 1:
+            time.sleep(0.001)
+
+        self.release.set()
+
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        return results
+
+    def test_concurrent_calls_are_coalesced(self):
+        results = self.run_concurrently(u'value')
+
+        self.assertEqual(results, [u'value'] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.coalesced, {u'key': 4})
+
+    def test_errors_are_shared(self):
+        error = IOError(u'missing')
+        results = self.run_concurrently(error)
+
+        self.assertEqual(results, [error] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_later_calls_are_not_coalesced(self):
+        self.release.set()
+
+        self.flight.do(u'key', self.slow, u'value')
+        self.flight.do(u'key', self.slow, u'value')
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.flight.coalesced, {})
@@ -0,0 +1,70 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+from Locales.Locales import Locales
+from Locales.Frozen import FrozenDict, freeze
+from flask import Flask, session, g, Blueprint
+from tests.WithContext import WithContext
+from tests.config import CONFIG
+
+# blueprints using a common templates folder
+blueprint = Blueprint(u'blueprint', __name__)
+
+
+class FreezeTestCase(unittest.TestCase):
+
+    def test_freeze_is_recursive(self):
+        frozen = freeze({u'a': {u'b': [1, {u'c': 2}]}})
+
+        self.assertIsInstance(frozen, FrozenDict)
+        self.assertIsInstance(frozen[u'a'], FrozenDict)
+        self.assertEqual(frozen[u'a'][u'b'], (1, {u'c': 2}))
+        self.assertIsInstance(frozen[u'a'][u'b'][1], FrozenDict)
+
+    def test_frozen_dicts_are_read_only(self):
+        frozen = freeze({u'a': 1})
+
+        with self.assertRaises(TypeError):
+            frozen[u'a'] = 2
+
+        with self.assertRaises(TypeError):
+            frozen.update(b=2)
+
+        self.assertEqual(frozen, {u'a': 1})
+
+
+class ContextFreezeTestCase(WithContext, unittest.TestCase):
+
+    def create_app(self):
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_CACHE_SIZE'] = 4
+        app.config[u'LOCALES_FREEZE'] = True
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        # reset session before each test
+        session[u'locale'] = None
+
+    def test_frozen_cache_holds_every_context(self):
+        self.assertTrue(g.locales.cache.frozen)
+        self.assertEqual(len(g.locales.cache), 12)
+
+    def test_frozen_context_is_read_only(self):
+        g.locales.current = u'en'
+        context = g.locales.load(u'localed_context.yaml')
+
+        self.assertEqual(context.get(u'path'), u'en/localed_context.yaml')
+        self.assertIsInstance(context, FrozenDict)
+
+    def test_frozen_context_still_renders(self):
+        g.locales.current = u'zh_Hans'
+        result = g.locales.render_template(u'template.html', u'context.yaml', other=u'extra').split()
+
+        self.assertEqual(result, [u'zh_Hans/template.html', u'zh_Hans/context.yaml', u'extra'])
@@ -0,0 +1,120 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import os
+import shutil
+import tempfile
+from Locales.Index import ContextIndex
+from Locales.Locales import Locales
+from flask import Flask, g
+from tests.WithContext import WithContext
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+__author__ = 'gary'
+
+here = os.path.dirname(__file__)
+
+
+class ContextIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ContextIndex(here)
+
+    def test_index_lists_context_files(self):
+        files = list(self.index)
+
+        self.assertIn(os.path.join(u'en', u'localed_context.yaml'), files)
+        self.assertIn(os.path.join(u'blueprint', u'common_context.yaml'), files)
+
+    def test_resolve_localed_context(self):
+        resolved = self.index.resolve(
+            u'localed_context.yaml', u'en',
+            (u'en/localed_context.yaml', u'localed_context.yaml')
+        )
+
+        self.assertEqual(resolved, os.path.join(here, u'context', u'en/localed_context.yaml'))
+
+    def test_resolve_common_context(self):
+        resolved = self.index.resolve(
+            u'common_context.yaml', u'en',
+            (u'en/common_context.yaml', u'common_context.yaml')
+        )
+
+        self.assertEqual(resolved, os.path.join(here, u'context', u'common_context.yaml'))
+
+    def test_resolve_alt_common_context(self):
+        resolved = self.index.resolve(
+            u'alt_context.yaml', u'en',
+            (u'en/alt_context.yaml', u'alt_context.yaml')
+        )
+
+        self.assertEqual(resolved, os.path.join(here, u'alt_context.yaml'))
+
+    def test_misses_are_remembered(self):
+        resolved = self.index.resolve(u'_missing_.yaml', u'en', (u'en/_missing_.yaml', u'_missing_.yaml'))
+
+        self.assertIsNone(resolved)
+        self.assertIn((u'_missing_.yaml', u'en'), self.index._resolved)
+
+
+class ContextIndexChangesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, u'context', u'en'))
+
+        self.index = ContextIndex(self.root)
+        self.index.build()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_new_files_make_the_index_stale(self):
+        self.assertFalse(self.index.stale())
+
+        path = os.path.join(self.root, u'context', u'en', u'context.yaml')
+        open(path, u'w').close()
+
+        # force the directory mtime to change, regardless of timer resolution
+        os.utime(os.path.dirname(path), (0, 0))
+
+        self.assertTrue(self.index.stale())
+
+        self.index.build()
+
+        self.assertEqual(
+            self.index.resolve(u'context.yaml', u'en', (u'en/context.yaml', u'context.yaml')),
+            os.path.join(self.root, u'context', u'en/context.yaml')
+        )
+
+
+class LocalesIndexChangesTestCase(WithFiles, WithContext, unittest.TestCase):
+    """
+    Without debug or a watcher the index isn't rebuilt, so a removed file falls through to the next attempt
+    """
+
+    files = {
+        u'context/en/page.yaml': u'path: en/page.yaml',
+        u'context/page.yaml': u'path: page.yaml',
+    }
+
+    def create_app(self):
+        app = Flask(__name__, root_path=self.root)
+        app.config.from_object(CONFIG)
+        app.config[u'DEBUG'] = False
+
+        Locales(app)
+
+        return app
+
+    def test_removed_file_falls_back(self):
+        g.locales.current = u'en'
+
+        self.assertEqual(g.locales.load(u'page.yaml')[u'path'], u'en/page.yaml')
+
+        os.remove(os.path.join(self.root, u'context', u'en', u'page.yaml'))
+
+        self.assertEqual(g.locales.load(u'page.yaml')[u'path'], u'page.yaml')
+        self.assertEqual(g.locales.load(u'page.yaml')[u'path'], u'page.yaml')
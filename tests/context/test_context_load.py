@@ -5,7 +5,7 @@ import unittest
 import codecs
 import os
 from Locales.Locales import Locales
-from Locales.Loaders import json_caching_yaml_loader
+from Locales.Loaders import json_caching_yaml_loader, compiled_caching_yaml_loader, lazy_caching_yaml_loader
 from flask import Flask, session, g, Blueprint, json, current_app
 from tests.WithContext import WithContext
 from tests.config import CONFIG
@@ -172,3 +172,43 @@ class JCYLContextLoadTestCase(WithContext, ContextLoadTests, unittest.TestCase):
         Locales.context_loader = json_caching_yaml_loader
 
         return app
+
+
+class CompiledContextLoadTestCase(WithContext, ContextLoadTests, unittest.TestCase):
+    """
+    Test Strategies
+
+     - each template returns a string containing its path. This way I can easily confirm which template rendered by simply checking the returned string.
+
+    """
+
+    def create_app(self):
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+        Locales.context_loader = compiled_caching_yaml_loader
+
+        return app
+
+
+class LazyContextLoadTestCase(WithContext, ContextLoadTests, unittest.TestCase):
+    """
+    Test Strategies
+
+     - each template returns a string containing its path. This way I can easily confirm which template rendered by simply checking the returned string.
+
+    """
+
+    def create_app(self):
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+        Locales.context_loader = lazy_caching_yaml_loader
+
+        return app
@@ -1,77 +1,55 @@
 # -*- coding: UTF-8 -*- #
 
+import json
+import os
+import shutil
+import tempfile
 import unittest
-import pprint
-from datetime import datetime
 
-from Locales.Locales import Locales
-from Locales.Loaders import yaml_loader, json_loader, json_caching_yaml_loader
-from flask import Flask, g, Blueprint
-from tests.WithContext import WithContext
-from tests.config import CONFIG
+from Locales import bench
 
-# blueprints using a common templates folder
-blueprint = Blueprint(u'blueprint', __name__)
 
-
-class ContextLoadTimingTestCase(WithContext, unittest.TestCase):
+class BenchTestCase(unittest.TestCase):
     """
-    Test Strategies
-
-     - each template returns a string containing its path. This way I can easily confirm which template rendered by simply checking the returned string.
-
+    Smoke test the benchmarks. Run them properly with python -m Locales.bench
     """
 
-    def create_app(self):
-        app = Flask(__name__, template_folder=u'templates')
-        app.config.from_object(CONFIG)
-
-        app.register_blueprint(blueprint)
-
-        Locales(app)
+    def test_run(self):
+        results = bench.run(iterations=1, repeat=1, sizes=(10,), locale_counts=(2, 3))
 
-        return app
+        names = set(result[u'name'] for result in results)
 
-    def test_load_localed_context(self):
-        """
-        If the specified file is located within the current locale's context folder, load it
-        :return:
-        """
+        self.assertEqual(names, {
+            u'load.cold', u'load.warm', u'load.memory', u'load.pack',
+            u'localify_path',
+            u'render_template.localized', u'render_template.fallback',
+            u'accept_language.cached', u'accept_language.uncached'
+        })
 
-        results = dict()
-        filename = u'time_test'
+        loaders = set(result[u'params'][u'loader'] for result in results if result[u'name'] == u'load.cold')
+        self.assertEqual(loaders, set(loader[0] for loader in bench.LOADERS))
 
-        for i in (1, 10, 100):
+        counts = set(result[u'params'].get(u'locales') for result in results if result[u'name'] == u'localify_path')
+        self.assertEqual(counts, {2, 3})
 
-            cum_yaml = 0.
-            cum_jcyl = 0.
-            cum_json = 0.
+        for result in results:
+            self.assertGreater(result[u'best'], 0.)
+            self.assertLessEqual(result[u'best'], result[u'median'])
 
-            for j in range(i):
+    def test_output(self):
+        folder = tempfile.mkdtemp()
 
-                start = datetime.utcnow()
-                Locales.context_loader = yaml_loader
-                context = g.locales.load(u'{0}.yaml'.format(filename))
-                end = datetime.utcnow()
-                cum_yaml += (end - start).microseconds
+        try:
+            path = os.path.join(folder, u'results.json')
 
-                start = datetime.utcnow()
-                Locales.context_loader = json_loader
-                context = g.locales.load(u'{0}.json'.format(filename))
-                end = datetime.utcnow()
-                cum_json += (end - start).microseconds
+            bench.main([u'--iterations', u'1', u'--repeat', u'1', u'--sizes', u'10', u'--locales', u'2',
+                        u'--output', path])
 
-                start = datetime.utcnow()
-                Locales.context_loader = json_caching_yaml_loader
-                context = g.locales.load(u'{0}.yaml'.format(filename))
-                end = datetime.utcnow()
-                cum_jcyl += (end - start).microseconds
+            with open(path) as infile:
+                data = json.load(infile)
 
-            results[unicode(i)] = {
-                u'json': cum_json,
-                u'yaml': cum_yaml,
-                u'jcyl': cum_jcyl
-            }
+            self.assertIn(u'yaml_backend', data)
+            self.assertTrue(data[u'results'])
 
-        print u'Loader timing comparison'
-        pprint.pprint(results)
+        finally:
+            shutil.rmtree(folder)
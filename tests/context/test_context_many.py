@@ -0,0 +1,80 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import time
+from Locales.Locales import Locales
+from Locales.Contexts import ContextView
+from flask import Flask, session, g
+from tests.WithContext import WithContext
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+
+class LoadManyTestCase(WithFiles, WithContext, unittest.TestCase):
+
+    files = {
+        u'context/header.yaml': u'{title: Header, header: header, en: {greeting: Hello, farewell: Bye}}',
+        u'context/en/page.yaml': u'{title: Page, page: page, en: {greeting: Welcome}}',
+        u'templates/page.html': u'{{ title }} {{ header }} {{ page }} {{ greeting }} {{ farewell }}',
+    }
+
+    def create_app(self):
+        app = Flask(__name__, root_path=self.root, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_STATS'] = True
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        session[u'locale'] = None
+        g.locales.current = u'en'
+
+    def merges(self):
+        counters = g.locales.stats.counters()
+
+        return [counters.get((u'context_merge', ((u'result', result),)), 0) for result in (u'hit', u'miss')]
+
+    def test_later_files_take_precedence(self):
+        context = g.locales.load_many([u'header.yaml', u'page.yaml'])
+
+        self.assertIsInstance(context, ContextView)
+        self.assertEqual(context[u'title'], u'Page')
+        self.assertEqual(context[u'header'], u'header')
+        self.assertEqual(context[u'page'], u'page')
+
+    def test_merged_context_is_cached(self):
+        first = g.locales.load_many([u'header.yaml', u'page.yaml'])
+        second = g.locales.load_many([u'header.yaml', u'page.yaml'])
+
+        self.assertIs(first, second)
+        self.assertEqual(self.merges(), [1, 1])
+
+    def test_modified_file_is_reloaded(self):
+        g.locales.load_many([u'header.yaml', u'page.yaml'])
+
+        # make sure the signature changes
+        time.sleep(0.01)
+        self.write(u'context/header.yaml', u'{header: changed}')
+
+        self.assertEqual(g.locales.load_many([u'header.yaml', u'page.yaml'])[u'header'], u'changed')
+        self.assertEqual(self.merges(), [0, 2])
+
+    def test_invalidate_clears_merged_context(self):
+        g.locales.load_many([u'header.yaml', u'page.yaml'])
+        g.locales.invalidate()
+        g.locales.load_many([u'header.yaml', u'page.yaml'])
+
+        self.assertEqual(self.merges(), [0, 2])
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(IOError):
+            g.locales.load_many([u'header.yaml', u'missing.yaml'])
+
+    def test_render_template_with_several_contexts(self):
+        self.assertEqual(
+            g.locales.render_template(u'page.html', [u'header.yaml', u'page.yaml']),
+            u'Page header page Welcome Bye'
+        )
@@ -0,0 +1,81 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+from Locales.Locales import Locales
+from flask import Flask, session, g, Blueprint
+from tests.WithContext import WithContext
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+# blueprints using a common templates folder
+blueprint = Blueprint(u'blueprint', __name__)
+
+
+class ContextWarmTestCase(WithContext, unittest.TestCase):
+
+    def create_app(self):
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_WARM'] = True
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        # reset session before each test
+        session[u'locale'] = None
+
+    def test_warm_loads_every_context_for_every_locale(self):
+        count, elapsed = g.locales.warm()
+
+        # 6 context files, 2 locales
+        self.assertEqual(count, 12)
+        self.assertGreater(elapsed, 0)
+
+    def test_warmed_context_is_served_from_the_cache(self):
+        misses = g.locales.cache.misses
+
+        g.locales.current = u'zh_Hans'
+        context = g.locales.load(u'blueprint/localed_context.yaml')
+
+        self.assertEqual(context.get(u'path'), u'blueprint/zh_Hans/localed_context.yaml')
+        self.assertEqual(g.locales.cache.misses, misses)
+
+
+class ContextWarmFilesTestCase(WithFiles, WithContext, unittest.TestCase):
+    """
+    Only files which can be loaded, for the locales they resolve for, are warmed
+    """
+
+    files = {
+        u'context/common.yaml': u'path: common.yaml',
+        u'context/zh_Hans/only.yaml': u'path: zh_Hans/only.yaml',
+        u'context/.gitkeep': u'',
+        u'context/en/.page.yaml.swp': u'binary',
+        u'context/notes.txt': u'not context',
+    }
+
+    def create_app(self):
+        app = Flask(__name__, root_path=self.root)
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_FREEZE'] = True
+
+        Locales(app)
+
+        return app
+
+    def test_contexts_resolve(self):
+        self.assertEqual(g.locales._contexts(), [
+            (u'common.yaml', u'en'),
+            (u'common.yaml', u'zh_Hans'),
+            (u'only.yaml', u'zh_Hans')
+        ])
+
+    def test_warm(self):
+        count, elapsed = g.locales.warm()
+
+        self.assertEqual(count, 3)
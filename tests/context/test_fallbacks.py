@@ -0,0 +1,62 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+from Locales.Locales import Locales
+from flask import Flask, session, g
+from tests.WithContext import WithContext
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+
+class FallbackTestCase(WithFiles, WithContext, unittest.TestCase):
+    """
+    zh_Hant falls back to zh, then to the default, en
+    """
+
+    files = {
+        u'context/en/page.yaml': u'path: en/page.yaml',
+        u'context/zh/page.yaml': u'path: zh/page.yaml',
+        u'context/en/default_only.yaml': u'path: en/default_only.yaml',
+        u'context/sections.yaml': u'{en: {greeting: Hello, farewell: Goodbye}, zh: {greeting: 你好}}',
+        u'templates/zh/page.html': u'zh/page.html',
+        u'templates/en/default_only.html': u'en/default_only.html',
+        u'templates/sections.html': u'{{ greeting }} {{ farewell }}',
+    }
+
+    def create_app(self):
+        app = Flask(__name__, root_path=self.root, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES'] = [(u'en', u'EN'), (u'zh_Hans', u'简体'), (u'zh_Hant', u'繁體')]
+        app.config[u'LOCALES_STATS'] = True
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        session[u'locale'] = None
+        g.locales.current = u'zh_Hant'
+
+    def test_context_falls_back_to_the_base_language(self):
+        self.assertEqual(g.locales.load(u'page.yaml')[u'path'], u'zh/page.yaml')
+
+        tiers = [dict(labels)[u'tier'] for name, labels in g.locales.stats.timings() if name == u'context_load']
+        self.assertEqual(tiers, [u'fallback'])
+
+    def test_context_falls_back_to_the_default(self):
+        self.assertEqual(g.locales.load(u'default_only.yaml')[u'path'], u'en/default_only.yaml')
+
+    def test_templates_fall_back(self):
+        self.assertEqual(g.locales.render_template(u'page.html'), u'zh/page.html')
+        self.assertEqual(g.locales.render_template(u'default_only.html'), u'en/default_only.html')
+
+    def test_sections_fall_back(self):
+        self.assertEqual(g.locales.render_template(u'sections.html', u'sections.yaml'), u'你好 Goodbye')
+
+    def test_fallback_overrides(self):
+        self.app.config[u'LOCALES_FALLBACKS'] = {u'zh_Hant': [u'zh_Hans']}
+
+        locales = Locales(self.app)
+
+        self.assertEqual(locales.chains[u'zh_Hant'], (u'zh_Hant', u'zh_Hans', u'en'))
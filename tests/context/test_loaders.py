@@ -0,0 +1,160 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import os
+import shutil
+import tempfile
+import time
+import yaml
+from Locales.Loaders import yaml_loader, json_caching_yaml_loader, compiled_caching_yaml_loader, YAML_BACKEND, _FileLock
+from Locales.Loaders import lazy_caching_yaml_loader, _lock_path
+
+
+class YAMLLoaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, u'context.yaml')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, content):
+        with open(self.path, u'wb') as outfile:
+            outfile.write(content.encode(u'utf-8'))
+
+    def test_backend_is_reported(self):
+        expected = u'libyaml' if yaml.__with_libyaml__ else u'python'
+
+        self.assertEqual(YAML_BACKEND, expected)
+
+    def test_utf8_is_decoded(self):
+        self.write(u'greeting: 你好\n')
+
+        self.assertEqual(yaml_loader(None, self.path), {u'greeting': u'你好'})
+
+    def test_unsafe_tags_are_rejected(self):
+        self.write(u'greeting: !!python/object/apply:os.getcwd []\n')
+
+        with self.assertRaises(yaml.YAMLError):
+            yaml_loader(None, self.path)
+
+
+class CachingLoaderTests(object):
+    """
+    Cache files are written atomically, and rebuilt by one process at a time
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, u'context.yaml')
+
+        self.write(u'path: first\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, content):
+        with open(self.path, u'w') as outfile:
+            outfile.write(content)
+
+        # push the mtime past the cache file's
+        os.utime(self.path, (0, time.time() + 10))
+
+    def test_no_temporary_files_are_left(self):
+        self.loader(None, self.path)
+
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.folder, u'.cc'))),
+            sorted([os.path.basename(self.cache_path), u'.lock'])
+        )
+
+    def test_corrupt_cache_is_rebuilt(self):
+        self.loader(None, self.path)
+
+        with open(self.cache_path, u'wb') as outfile:
+            outfile.write(b'{"pa')
+
+        self.assertEqual(self.loader(None, self.path), {u'path': u'first'})
+        self.assertEqual(self.loader(None, self.path), {u'path': u'first'})
+
+    def test_previous_version_is_served_while_another_process_rebuilds(self):
+        self.loader(None, self.path)
+        self.write(u'path: second\n')
+
+        lock = _FileLock(_lock_path(self.cache_path))
+        self.assertTrue(lock.acquire())
+
+        try:
+            self.assertEqual(self.loader(None, self.path), {u'path': u'first'})
+        finally:
+            lock.release()
+
+        self.assertEqual(self.loader(None, self.path), {u'path': u'second'})
+
+    def test_one_lock_per_folder(self):
+        other = os.path.join(self.folder, u'other.yaml')
+
+        with open(other, u'w') as outfile:
+            outfile.write(u'path: other\n')
+
+        self.loader(None, self.path)
+        self.loader(None, other)
+
+        self.assertEqual(len([f for f in os.listdir(os.path.join(self.folder, u'.cc')) if u'lock' in f]), 1)
+
+    def test_lock_is_released(self):
+        self.loader(None, self.path)
+
+        lock = _FileLock(_lock_path(self.cache_path))
+
+        self.assertTrue(lock.acquire(blocking=False))
+        lock.release()
+
+
+class JCYLCachingLoaderTestCase(CachingLoaderTests, unittest.TestCase):
+
+    loader = staticmethod(json_caching_yaml_loader)
+
+    @property
+    def cache_path(self):
+        return os.path.join(self.folder, u'.cc', u'context.json')
+
+
+class CompiledCachingLoaderTestCase(CachingLoaderTests, unittest.TestCase):
+
+    loader = staticmethod(compiled_caching_yaml_loader)
+
+    @property
+    def cache_path(self):
+        return os.path.join(self.folder, u'.cc', u'context.lcc')
+
+
+class LazyCachingLoaderTestCase(CachingLoaderTests, unittest.TestCase):
+
+    loader = staticmethod(lazy_caching_yaml_loader)
+
+    @property
+    def cache_path(self):
+        return os.path.join(self.folder, u'.cc', u'context.lci')
+
+    def assertCached(self, content, expected):
+        self.write(content)
+
+        self.assertEqual(self.loader(None, self.path), expected)
+        self.assertTrue(os.path.isfile(self.cache_path))
+
+        # served from the cache, without parsing the yaml again
+        with open(self.path, u'w') as outfile:
+            outfile.write(u'not: [valid')
+
+        os.utime(self.path, (0, os.path.getmtime(self.cache_path) - 10))
+
+        self.assertEqual(self.loader(None, self.path), expected)
+
+    def test_empty_context_is_cached(self):
+        self.assertCached(u'', None)
+
+    def test_list_context_is_cached(self):
+        self.assertCached(u'- one\n- two\n', [u'one', u'two'])
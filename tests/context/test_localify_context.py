@@ -59,3 +59,22 @@ class LocalifyContextTestCase(WithContext, unittest.TestCase):
             u'zh_Hans': {u'greeting': u'你好'}
         }
         self.assertEqual(g.locales._localify_context(**context), expected)
+
+    def test_localify_context_does_not_modify_loaded_context(self):
+        loaded = {
+            u'en': {u'greeting': u'Hello'},
+            u'zh_Hans': {u'greeting': u'你好'}
+        }
+
+        g.locales.current = u'zh_Hans'
+        context = g.locales._localify_context(loaded, other=u'extra')
+
+        self.assertEqual(context[u'greeting'], u'你好')
+        self.assertEqual(context[u'other'], u'extra')
+        self.assertNotIn(u'greeting', loaded)
+
+    def test_keyword_context_takes_precedence_over_loaded_context(self):
+        g.locales.current = u'en'
+        context = g.locales._localify_context({u'greeting': u'loaded'}, greeting=u'keyword')
+
+        self.assertEqual(context[u'greeting'], u'keyword')
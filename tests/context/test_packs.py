@@ -0,0 +1,141 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import os
+import shutil
+import tempfile
+from click.testing import CliRunner
+from flask import Flask, session, g
+from flask.cli import ScriptInfo
+from Locales.Locales import Locales
+from Locales.Commands import cli
+from Locales.Packs import Pack, write_pack
+from tests.WithContext import WithContext
+from tests.config import CONFIG
+
+here = os.path.dirname(__file__)
+
+
+class PackTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, u'en.pack')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_round_trip(self):
+        entries = {u'context.yaml': {u'path': u'en/context.yaml'}, u'blueprint/list.yaml': [1, 2]}
+
+        write_pack(self.path, entries)
+        pack = Pack(self.path)
+
+        self.assertEqual(list(pack), [u'blueprint/list.yaml', u'context.yaml'])
+        self.assertIn(u'context.yaml', pack)
+        self.assertNotIn(u'missing.yaml', pack)
+
+        self.assertEqual(pack.lookup(u'context.yaml'), ({u'path': u'en/context.yaml'}, False))
+        self.assertEqual(pack.lookup(u'context.yaml'), ({u'path': u'en/context.yaml'}, True))
+        self.assertEqual(pack.lookup(u'blueprint/list.yaml')[0], [1, 2])
+
+        with self.assertRaises(KeyError):
+            pack.lookup(u'missing.yaml')
+
+    def test_other_files_are_rejected(self):
+        with open(self.path, u'wb') as outfile:
+            outfile.write(b'not a pack')
+
+        with self.assertRaises(ValueError):
+            Pack(self.path)
+
+
+class LocalesPackTestCase(WithContext, unittest.TestCase):
+
+    def create_app(self):
+        self.root = tempfile.mkdtemp()
+
+        shutil.copytree(os.path.join(here, u'context'), os.path.join(self.root, u'context'))
+        shutil.copy(os.path.join(here, u'alt_context.yaml'), self.root)
+
+        app = Flask(__name__, root_path=self.root)
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_PACKS'] = True
+        app.config[u'LOCALES_STATS'] = True
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        session[u'locale'] = None
+
+    def afterEach(self):
+        shutil.rmtree(self.root)
+
+    def tiers(self):
+        return sorted(dict(labels)[u'tier'] for name, labels in g.locales.stats.timings() if name == u'context_load')
+
+    def test_loose_files_are_used_without_packs(self):
+        g.locales.current = u'en'
+
+        self.assertEqual(g.locales.load(u'context.yaml')[u'path'], u'en/context.yaml')
+        self.assertEqual(self.tiers(), [u'locale'])
+
+    def test_packs_hold_every_path_for_every_locale(self):
+        g.locales.build_packs()
+
+        for locale in (u'en', u'zh_Hans'):
+            pack = g.locales._pack(locale)
+
+            self.assertEqual(list(pack), [
+                u'blueprint/common_context.yaml',
+                u'blueprint/context.yaml',
+                u'blueprint/localed_context.yaml',
+                u'common_context.yaml',
+                u'context.yaml',
+                u'localed_context.yaml'
+            ])
+
+    def test_build_counts_the_entries_written(self):
+        # an empty file is packed as it loads, and only for the locale it exists in
+        os.makedirs(os.path.join(self.root, u'context', u'extra', u'zh_Hans'))
+        open(os.path.join(self.root, u'context', u'extra', u'zh_Hans', u'empty.yaml'), u'w').close()
+
+        count, elapsed = g.locales.build_packs()
+
+        self.assertEqual(count, 13)
+        self.assertEqual(count, sum(len(list(g.locales._pack(locale))) for locale in (u'en', u'zh_Hans')))
+
+        g.locales.current = u'zh_Hans'
+        self.assertIsNone(g.locales.load(u'extra/empty.yaml'))
+
+    def test_load_from_packs(self):
+        g.locales.build_packs()
+
+        g.locales.current = u'zh_Hans'
+
+        self.assertEqual(g.locales.load(u'blueprint/localed_context.yaml')[u'path'],
+                         u'blueprint/zh_Hans/localed_context.yaml')
+        self.assertEqual(g.locales.load(u'common_context.yaml')[u'path'], u'context/common_context.yaml')
+
+        # nothing was read from the loose files
+        self.assertEqual(len(g.locales.cache), 0)
+        self.assertEqual(self.tiers(), [u'pack', u'pack'])
+
+    def test_paths_outside_the_pack_fall_through_to_files(self):
+        g.locales.build_packs()
+
+        g.locales.current = u'en'
+
+        self.assertEqual(g.locales.load(u'alt_context.yaml')[u'path'], u'alt_context.yaml')
+        self.assertEqual(self.tiers(), [u'root'])
+
+    def test_cli(self):
+        result = CliRunner().invoke(cli, [u'pack'], obj=ScriptInfo(create_app=lambda info: self.app))
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn(u'Packed 12 contexts for 2 locales', result.output)
+
+        self.assertTrue(os.path.isfile(os.path.join(self.root, u'context', u'.cc', u'zh_Hans.pack')))
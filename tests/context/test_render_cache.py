@@ -0,0 +1,232 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import os
+import shutil
+import tempfile
+import time
+from Locales.Locales import Locales
+from Locales.Cache import MemoryRenderCache, FileRenderCache
+from flask import Flask, session, g
+from tests.WithContext import WithContext
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+
+class MemoryRenderCacheTestCase(unittest.TestCase):
+
+    def test_entries_expire(self):
+        cache = MemoryRenderCache(ttl=0.01)
+        cache.set(u'key', u'rendered')
+
+        self.assertEqual(cache.get(u'key'), u'rendered')
+
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get(u'key'))
+        self.assertNotIn(u'key', cache)
+
+    def test_size_is_bounded(self):
+        cache = MemoryRenderCache(maxsize=1)
+        cache.set(u'a', u'a')
+        cache.set(u'b', u'b')
+
+        self.assertIsNone(cache.get(u'a'))
+        self.assertEqual(cache.get(u'b'), u'b')
+
+
+class FileRenderCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = os.path.join(tempfile.mkdtemp(), u'renders')
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.folder))
+
+    def test_round_trip(self):
+        cache = FileRenderCache(self.folder)
+        key = (u'en/template.html', u'en', (u'/context.yaml', (1.0, 10)), None)
+
+        self.assertIsNone(cache.get(key))
+
+        cache.set(key, u'rendered 你好')
+
+        self.assertEqual(cache.get(key), u'rendered 你好')
+        self.assertEqual(FileRenderCache(self.folder).get(key), u'rendered 你好')
+
+        cache.clear()
+
+        self.assertIsNone(cache.get(key))
+
+    def test_entries_expire(self):
+        cache = FileRenderCache(self.folder, ttl=10)
+        cache.set(u'key', u'rendered')
+
+        self.assertEqual(cache.get(u'key'), u'rendered')
+
+        cache.ttl = -1
+
+        self.assertIsNone(cache.get(u'key'))
+        self.assertEqual(os.listdir(self.folder), [])
+
+    def test_size_is_bounded(self):
+        cache = FileRenderCache(self.folder, maxsize=2)
+
+        for i, key in enumerate((u'a', u'b', u'c')):
+            cache.set(key, key)
+
+            # make sure the mtimes differ
+            os.utime(cache._path(key), (0, time.time() - 10 + i))
+
+        self.assertIsNone(cache.get(u'a'))
+        self.assertEqual(cache.get(u'b'), u'b')
+        self.assertEqual(cache.get(u'c'), u'c')
+
+    def test_clear_only_removes_entries(self):
+        cache = FileRenderCache(self.folder)
+        cache.set(u'key', u'rendered')
+
+        for filename in (u'notes.txt', u'0' * 40, cache.prefix + u'x' * 40):
+            with open(os.path.join(self.folder, filename), u'w') as outfile:
+                outfile.write(u'not an entry')
+
+        cache.clear()
+
+        self.assertIsNone(cache.get(u'key'))
+        self.assertEqual(sorted(os.listdir(self.folder)), [u'0' * 40, u'notes.txt', cache.prefix + u'x' * 40])
+
+
+class RenderCacheTestCase(WithFiles, WithContext, unittest.TestCase):
+
+    files = {
+        u'context/en/context.yaml': u'path: first',
+        u'templates/en/template.html': u'{{ path }} {{ other }}',
+        u'templates/en/session.html': u'{{ session.user }}',
+        u'templates/en/cache.html': u'[{{ cache }}]',
+    }
+
+    def create_app(self):
+        app = Flask(__name__, root_path=self.root, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_RENDER_CACHE'] = u'memory'
+        app.config[u'LOCALES_STATS'] = True
+
+        locales = Locales(app)
+
+        @app.route(u'/<user>')
+        def user(user):
+            session[u'user'] = user
+            return locales.render_template(u'session.html')
+
+        return app
+
+    def beforeEach(self):
+        session[u'locale'] = None
+        g.locales.current = u'en'
+
+        # count the renders that aren't served from the cache
+        self.renders = 0
+        render = g.locales._render
+
+        def counting(*args):
+            self.renders += 1
+            return render(*args)
+
+        g.locales._render = counting
+
+    def render(self, **ctx):
+        return g.locales.render_template_cached(u'template.html', u'context.yaml', **ctx)
+
+    def test_disabled_by_default(self):
+        app = Flask(__name__)
+        app.config.from_object(CONFIG)
+
+        self.assertIsNone(Locales(app).render_cache)
+
+    def test_unknown_backend(self):
+        app = Flask(__name__)
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_RENDER_CACHE'] = u'redis'
+
+        with self.assertRaises(ValueError):
+            Locales(app)
+
+    def test_renders_are_only_cached_on_request(self):
+        g.locales.render_template(u'template.html', u'context.yaml')
+        g.locales.render_template(u'template.html', u'context.yaml')
+
+        self.assertEqual(self.renders, 2)
+
+    def test_cache_is_an_ordinary_template_variable(self):
+        self.assertEqual(g.locales.render_template(u'cache.html', cache=u'my value'), u'[my value]')
+        self.assertEqual(g.locales.render_template_cached(u'cache.html', cache=u'my value'), u'[my value]')
+
+    def test_uncached_renders_are_not_shared_between_requests(self):
+        self.assertEqual(self.client.get(u'/a').data, b'a')
+        self.assertEqual(self.client.get(u'/b').data, b'b')
+
+    def test_repeat_renders_are_cached(self):
+        self.assertEqual(self.render(), u'first ')
+        self.assertEqual(self.render(), u'first ')
+
+        self.assertEqual(self.renders, 1)
+
+        counters = g.locales.stats.counters()
+
+        self.assertEqual(counters[(u'render_cache', ((u'result', u'miss'),))], 1)
+        self.assertEqual(counters[(u'render_cache', ((u'result', u'hit'),))], 1)
+
+    def test_keyword_context_is_part_of_the_key(self):
+        self.assertEqual(self.render(other=u'a'), u'first a')
+        self.assertEqual(self.render(other=u'b'), u'first b')
+        self.assertEqual(self.render(other=u'a'), u'first a')
+
+        self.assertEqual(self.renders, 2)
+
+    def test_locale_is_part_of_the_key(self):
+        self.render()
+
+        # zh_Hans falls back to the en files, but is rendered separately
+        g.locales.current = u'zh_Hans'
+
+        self.assertEqual(self.render(), u'first ')
+        self.assertEqual(self.renders, 2)
+
+    def test_unpicklable_context_is_not_cached(self):
+        self.render(other=lambda: None)
+        self.render(other=lambda: None)
+
+        self.assertEqual(self.renders, 2)
+
+    def test_modified_context_is_rendered_again(self):
+        self.render()
+
+        # make sure the signature changes
+        time.sleep(0.01)
+        self.write(u'context/en/context.yaml', u'path: second, modified')
+
+        self.assertEqual(self.render(), u'second, modified ')
+
+    def test_nothing_is_cached_with_auto_reload(self):
+        self.write(u'templates/base.html', u'v1 {% block body %}{% endblock %}')
+        self.write(u'templates/en/child.html', u'{% extends "base.html" %}{% block body %}x{% endblock %}')
+
+        self.app.jinja_env.auto_reload = True
+
+        self.assertEqual(g.locales.render_template_cached(u'child.html'), u'v1 x')
+
+        # make sure the signature changes
+        path = self.write(u'templates/base.html', u'v2 {% block body %}{% endblock %}')
+        os.utime(path, (0, time.time() + 10))
+
+        self.assertEqual(g.locales.render_template_cached(u'child.html'), u'v2 x')
+        self.assertEqual(self.renders, 2)
+
+    def test_invalidate_clears_the_cache(self):
+        self.render()
+
+        g.locales.invalidate()
+        self.render()
+
+        self.assertEqual(self.renders, 2)
@@ -0,0 +1,178 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+from Locales.Locales import Locales
+from Locales.Stats import MemoryStats
+from Locales.Signals import context_loaded, template_selected, locale_resolved
+from flask import Flask, session, g, Blueprint
+from flask.signals import signals_available
+from tests.WithContext import WithContext
+from tests.config import CONFIG
+
+# blueprints using a common templates folder
+blueprint = Blueprint(u'blueprint', __name__)
+
+
+class MemoryStatsTestCase(unittest.TestCase):
+
+    def test_counters(self):
+        stats = MemoryStats()
+
+        stats.incr(u'loads', source=u'session')
+        stats.incr(u'loads', source=u'session')
+        stats.incr(u'loads', 3, source=u'default')
+
+        self.assertEqual(stats.counters(), {
+            (u'loads', ((u'source', u'session'),)): 2,
+            (u'loads', ((u'source', u'default'),)): 3
+        })
+
+    def test_timings(self):
+        stats = MemoryStats()
+
+        stats.timing(u'load', 0.5, path=u'a.yaml')
+        stats.timing(u'load', 1.5, path=u'a.yaml')
+
+        self.assertEqual(stats.timings(), {(u'load', ((u'path', u'a.yaml'),)): (2, 2.0, 1.5)})
+
+        stats.reset()
+
+        self.assertEqual(stats.timings(), {})
+
+    def test_prometheus(self):
+        stats = MemoryStats()
+
+        stats.incr(u'resolutions', source=u'default')
+        stats.timing(u'load', 0.25, path=u'say "hi".yaml')
+
+        text = stats.prometheus()
+
+        self.assertIn(u'# TYPE locales_resolutions_total counter\n', text)
+        self.assertIn(u'locales_resolutions_total{source="default"} 1\n', text)
+        self.assertIn(u'# TYPE locales_load_seconds summary\n', text)
+        self.assertIn(u'locales_load_seconds_count{path="say \\"hi\\".yaml"} 1\n', text)
+        self.assertIn(u'locales_load_seconds_sum{path="say \\"hi\\".yaml"} 0.25\n', text)
+        self.assertIn(u'locales_load_seconds_max{path="say \\"hi\\".yaml"} 0.25\n', text)
+
+
+class InstrumentationTestCase(WithContext, unittest.TestCase):
+
+    def create_app(self):
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_METRICS_URL'] = u'/metrics/locales'
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        session[u'locale'] = None
+        g.locales.current = u'en'
+
+        self.stats = g.locales.stats
+
+    def test_metrics_url_enables_stats(self):
+        self.assertIsInstance(self.stats, MemoryStats)
+
+    def test_metrics_url_requires_prometheus(self):
+        class Sink(object):
+            def incr(self, name, value=1, **labels):
+                pass
+
+            def timing(self, name, seconds, **labels):
+                pass
+
+        app = Flask(__name__)
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_STATS'] = Sink()
+        app.config[u'LOCALES_METRICS_URL'] = u'/metrics/locales'
+
+        with self.assertRaises(ValueError):
+            Locales(app)
+
+    def test_stats_disabled_by_default(self):
+        app = Flask(__name__)
+        app.config.from_object(CONFIG)
+
+        self.assertIsNone(Locales(app).stats)
+
+    def test_load_records_tier_and_cache(self):
+        g.locales.load(u'localed_context.yaml')
+        g.locales.load(u'localed_context.yaml')
+        g.locales.load(u'common_context.yaml')
+        g.locales.load(u'alt_context.yaml')
+
+        timings = self.stats.timings()
+
+        self.assertEqual(
+            sorted((dict(labels)[u'path'], dict(labels)[u'tier'], dict(labels)[u'cache'], timing[0])
+                   for (name, labels), timing in timings.items() if name == u'context_load'),
+            [
+                (u'alt_context.yaml', u'root', u'miss', 1),
+                (u'common_context.yaml', u'context', u'miss', 1),
+                (u'localed_context.yaml', u'locale', u'hit', 1),
+                (u'localed_context.yaml', u'locale', u'miss', 1)
+            ]
+        )
+
+    def test_template_selection_is_timed(self):
+        g.locales.render_template(u'template.html', u'context.yaml')
+
+        count, total, _max = self.stats.timings()[(u'template_select', ())]
+
+        self.assertEqual(count, 1)
+
+    def test_locale_source(self):
+
+        # the app context, and so g, is shared with the outer request
+        with self.app.test_request_context(headers={u'Accept-Language': u'en'}):
+            g._locales_current = None
+            g.locales.current
+
+        with self.app.test_request_context():
+            g._locales_current = None
+            g.locales.current
+
+        counters = self.stats.counters()
+
+        self.assertEqual(counters[(u'locale_resolutions', ((u'source', u'accept_language'),))], 1)
+        self.assertEqual(counters[(u'locale_resolutions', ((u'source', u'default'),))], 1)
+
+    def test_metrics_endpoint(self):
+        g.locales.load(u'context.yaml')
+
+        rv = self.client.get(u'/metrics/locales')
+
+        self.assertEqual(rv.status_code, 200)
+        self.assertTrue(rv.mimetype, u'text/plain')
+        self.assertIn(b'locales_context_load_seconds_count{cache="miss",path="context.yaml",tier="locale"} 1',
+                      rv.data)
+
+    @unittest.skipUnless(signals_available, u'requires blinker')
+    def test_signals(self):
+        sent = []
+
+        def receiver(sender, **kwargs):
+            sent.append(kwargs)
+
+        with context_loaded.connected_to(receiver), template_selected.connected_to(receiver), \
+                locale_resolved.connected_to(receiver):
+
+            g._locales_current = None
+            session[u'locale'] = u'zh_Hans'
+
+            g.locales.load(u'common_context.yaml')
+            g.locales.render_template(u'template.html')
+
+        self.assertEqual(sent[0], {u'locale': u'zh_Hans', u'source': u'session'})
+
+        self.assertEqual(sent[1][u'tier'], u'context')
+        self.assertFalse(sent[1][u'hit'])
+        self.assertTrue(sent[1][u'resolved'].endswith(u'common_context.yaml'))
+
+        self.assertEqual(sent[2][u'template'], u'zh_Hans/template.html')
+        self.assertGreaterEqual(sent[2][u'elapsed'], 0.)
@@ -0,0 +1,154 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import os
+import shutil
+import tempfile
+from flask import Flask, g
+from Locales.Locales import Locales
+from Locales.Watchers import PollingWatcher, InotifyWatcher, INotify, create_watcher
+from tests.WithFiles import WithFiles
+from tests.config import CONFIG
+
+
+class WatcherTests(object):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, u'context.yaml')
+        self.write(u'path: first\n')
+
+        self.changes = []
+        self.watcher = self.create_watcher()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, content, path=None):
+        with open(path or self.path, u'w') as outfile:
+            outfile.write(content)
+
+    def callback(self, paths):
+        self.changes.extend(paths)
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.check(), [])
+        self.assertEqual(self.changes, [])
+
+    def test_modified_files_are_reported(self):
+        self.write(u'path: second, modified\n')
+
+        self.assertEqual(self.watcher.check(), [self.path])
+        self.assertEqual(self.changes, [self.path])
+
+    def test_added_and_removed_files_are_reported(self):
+        added = os.path.join(self.folder, u'added.yaml')
+        self.write(u'path: added\n', added)
+        os.remove(self.path)
+
+        self.assertEqual(self.watcher.check(), sorted([added, self.path]))
+
+    def test_hidden_folders_are_ignored(self):
+        os.makedirs(os.path.join(self.folder, u'.cc'))
+        self.watcher.check()
+
+        self.write(u'{}', os.path.join(self.folder, u'.cc', u'context.json'))
+
+        self.assertEqual(self.watcher.check(), [])
+
+
+class PollingWatcherTestCase(WatcherTests, unittest.TestCase):
+
+    def create_watcher(self):
+        return PollingWatcher([self.folder], self.callback)
+
+
+@unittest.skipIf(INotify is None, u'inotify_simple is not installed')
+class InotifyWatcherTestCase(WatcherTests, unittest.TestCase):
+
+    def create_watcher(self):
+        return InotifyWatcher([self.folder], self.callback, timeout=0.1)
+
+    def tearDown(self):
+        self.watcher._inotify.close()
+        super(InotifyWatcherTestCase, self).tearDown()
+
+
+class LocalesWatchTestCase(WithFiles, unittest.TestCase):
+
+    files = {
+        u'context/context.yaml': u'path: first\n',
+    }
+
+    def setUp(self):
+        super(LocalesWatchTestCase, self).setUp()
+
+        self.app = Flask(__name__, root_path=self.root)
+        self.app.config.from_object(CONFIG)
+        self.app.config[u'LOCALES_WATCH'] = u'poll'
+        self.app.config[u'LOCALES_WATCH_INTERVAL'] = 60
+
+        self.locales = Locales(self.app)
+
+    def tearDown(self):
+        if self.locales.watcher is not None:
+            self.locales.watcher.stop()
+
+        super(LocalesWatchTestCase, self).tearDown()
+
+    def load(self):
+        with self.app.test_request_context():
+            self.app.try_trigger_before_first_request_functions()
+            self.app.preprocess_request()
+
+            return g.locales.load(u'context.yaml')
+
+    def test_watcher_starts_with_the_first_request(self):
+        self.assertIsNone(self.locales.watcher)
+        self.assertTrue(self.locales.cache.validate)
+
+        self.load()
+
+        self.assertIsInstance(self.locales.watcher, PollingWatcher)
+        self.assertFalse(self.locales.cache.validate)
+
+    def test_changes_are_pushed_to_the_cache(self):
+        self.assertEqual(self.load().get(u'path'), u'first')
+
+        self.write(u'context/context.yaml', u'path: second, modified\n')
+
+        # cached, and not checked
+        self.assertEqual(self.load().get(u'path'), u'first')
+
+        self.locales.watcher.check()
+
+        self.assertEqual(self.load().get(u'path'), u'second, modified')
+
+    def test_unknown_watcher(self):
+        with self.assertRaises(ValueError):
+            create_watcher(u'unknown', [self.root], None)
+
+    def test_unknown_watcher_fails_in_init_app(self):
+        app = Flask(__name__, root_path=self.root)
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_WATCH'] = u'unknown'
+
+        with self.assertRaises(ValueError):
+            Locales(app)
+
+    def test_true_watches_with_auto(self):
+        app = Flask(__name__, root_path=self.root)
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_WATCH'] = True
+
+        locales = Locales(app)
+
+        with app.test_request_context():
+            app.try_trigger_before_first_request_functions()
+
+        try:
+            self.assertIsInstance(locales.watcher, (PollingWatcher, InotifyWatcher))
+            self.assertFalse(locales.cache.validate)
+        finally:
+            locales.watcher.stop()
@@ -0,0 +1,92 @@
+# -*- coding: UTF-8 -*- #
+
+import unittest
+
+import os
+import shutil
+import tempfile
+from click.testing import CliRunner
+from flask import Flask, session, g, Blueprint
+from flask.cli import ScriptInfo
+from jinja2 import FileSystemBytecodeCache
+from Locales.Locales import Locales
+from Locales.Commands import cli
+from tests.WithContext import WithContext
+from tests.config import CONFIG
+
+# blueprints using a common templates folder
+blueprint = Blueprint(u'blueprint', __name__)
+
+
+class BytecodeCacheTestCase(WithContext, unittest.TestCase):
+
+    def create_app(self):
+        self.folder = tempfile.mkdtemp()
+
+        app = Flask(__name__, template_folder=u'templates')
+        app.config.from_object(CONFIG)
+        app.config[u'LOCALES_BYTECODE_CACHE'] = self.folder
+
+        app.register_blueprint(blueprint)
+
+        Locales(app)
+
+        return app
+
+    def beforeEach(self):
+        session[u'locale'] = None
+
+    def afterEach(self):
+        shutil.rmtree(self.folder)
+
+    def compiled(self):
+        return [f for f in os.listdir(self.folder) if f.endswith(u'.cache')]
+
+    def test_bytecode_cache_is_installed(self):
+        self.assertIsInstance(self.app.jinja_env.bytecode_cache, FileSystemBytecodeCache)
+
+    def test_not_installed_by_default(self):
+        app = Flask(__name__)
+        app.config.from_object(CONFIG)
+
+        Locales(app)
+
+        self.assertIsNone(app.jinja_env.bytecode_cache)
+
+    def test_compile_templates(self):
+        count, elapsed = g.locales.compile_templates(self.app)
+
+        # every variant, for every locale
+        self.assertEqual(count, 6)
+        self.assertEqual(len(self.compiled()), 6)
+
+    def test_rendering_uses_compiled_templates(self):
+        g.locales.compile_templates(self.app)
+
+        compiled = []
+        compile = self.app.jinja_env.compile
+
+        def record(source, *args, **kwargs):
+            compiled.append(source)
+            return compile(source, *args, **kwargs)
+
+        self.app.jinja_env.compile = record
+
+        g.locales.current = u'zh_Hans'
+        self.assertEqual(g.locales.render_template(u'template.html').strip(), u'zh_Hans/template.html')
+
+        self.assertEqual(compiled, [])
+
+    def test_cli(self):
+        result = CliRunner().invoke(cli, [u'compile-templates'], obj=ScriptInfo(create_app=lambda info: self.app))
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn(u'Compiled 6 templates', result.output)
+
+    def test_cli_requires_a_bytecode_cache(self):
+        self.app.jinja_env.bytecode_cache = None
+
+        result = CliRunner().invoke(cli, [u'compile-templates'], obj=ScriptInfo(create_app=lambda info: self.app))
+
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn(u'LOCALES_BYTECODE_CACHE', result.output)
@@ -93,3 +93,38 @@ class TemplatesTestCase(WithContext, unittest.TestCase):
             g.locales.render_template(u'blueprint/template.html'),
             u'blueprint/zh_Hans/template.html'
         )
+
+    def test_template_candidates_are_cached(self):
+
+        g.locales.current = u'en'
+
+        candidates = g.locales._template_candidates(u'blueprint/template.html')
+
+        self.assertEqual(candidates, (u'blueprint/en/template.html', u'blueprint/template.html'))
+        self.assertIs(g.locales._template_candidates([u'blueprint/template.html']), candidates)
+
+        g.locales.current = u'zh_Hans'
+
+        self.assertEqual(
+            g.locales._template_candidates([u'_missing_', u'template.html']),
+            (u'zh_Hans/_missing_', u'zh_Hans/template.html', u'zh/_missing_', u'zh/template.html',
+             u'en/_missing_', u'en/template.html', u'_missing_', u'template.html')
+        )
+
+    def test_selected_template_is_cached(self):
+
+        g.locales.current = u'zh_Hans'
+        g.locales.render_template([u'_missing_', u'blueprint/template.html'])
+
+        candidates = g.locales._template_candidates([u'_missing_', u'blueprint/template.html'])
+
+        self.assertEqual(g.locales._selected[candidates], u'blueprint/zh_Hans/template.html')
+
+    def test_selected_template_is_not_cached_with_auto_reload(self):
+
+        self.app.jinja_env.auto_reload = True
+
+        g.locales.current = u'en'
+
+        self.assertEqual(g.locales.render_template(u'template.html'), u'en/template.html')
+        self.assertEqual(g.locales._selected, {})